@@ -0,0 +1,349 @@
+import asyncio
+import os
+import socket
+import sys
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import httpx
+from bs4 import BeautifulSoup
+import Cache
+import Config
+import Parser
+import RateLimiter
+import Retry
+import Session
+
+class LocalHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # so keep-alive actually works
+    disable_nagle_algorithm = True
+    body = b"<html><body><article><p>benchmark article</p></article></body></html>"
+
+    def do_GET(self):
+        self.server.connections.add(self.client_address)
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html')
+        self.send_header('Content-Length', str(len(self.body)))
+        self.end_headers()
+        self.wfile.write(self.body)
+
+    def log_message(self, *args):
+        pass
+
+class LocalServer(ThreadingHTTPServer):
+    request_queue_size = 128  # the default backlog of 5 drops connects when many fetches start at once
+
+def local_server(handler=LocalHandler):
+    server = LocalServer(('127.0.0.1', 0), handler)
+    server.connections = set()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def bench_session(n=200):
+    server = local_server()
+    url = f"http://127.0.0.1:{server.server_port}/article"
+    RateLimiter.limiter.rate = 0  # only measuring connections here
+
+    start = time.perf_counter()
+    for _ in range(n):
+        httpx.get(url)
+    fresh = time.perf_counter() - start
+    fresh_conns = len(server.connections)
+
+    server.connections.clear()
+    start = time.perf_counter()
+    for _ in range(n):
+        Session.get(url)
+    pooled = time.perf_counter() - start
+    pooled_conns = len(server.connections)
+
+    print(f"{n} requests to a local server")
+    print(f"new connection each time: {fresh:.3f}s, {fresh_conns} connections")
+    print(f"shared session:           {pooled:.3f}s, {pooled_conns} connections")
+    print(f"speedup {fresh / pooled:.2f}x")
+    Session.close()
+    server.shutdown()
+
+fixtures = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tests', 'fixtures', 'pages')
+
+def sample_pages():
+    # rough stand-ins for the kinds of pages get_content runs into, the parser tests use the same files
+    pages = {}
+    for name in sorted(os.listdir(fixtures)):
+        with open(os.path.join(fixtures, name), encoding='utf-8') as f:
+            pages[os.path.splitext(name)[0].replace('_', ' ')] = f.read()
+    return pages
+
+def bench_parsers(rounds=20):
+    pages = sample_pages()
+    expected = {name: (Parser.article_text(html, 'html.parser'), Parser.news_cards(html, 'html.parser')) for name, html in pages.items()}
+    for backend in Parser.available():
+        start = time.perf_counter()
+        for _ in range(rounds):
+            results = {name: (Parser.article_text(html, backend), Parser.news_cards(html, backend)) for name, html in pages.items()}
+        elapsed = time.perf_counter() - start
+        mismatched = [name for name in pages if results[name] != expected[name]]
+        print(f"{backend:12} {elapsed / rounds * 1000:8.2f} ms per round  {'same output' if not mismatched else f'DIFFERENT on {mismatched}'}")
+
+def parse(html, backend):
+    if backend == 'selectolax':
+        tree = Parser.LexborHTMLParser(html)
+        tree.strip_tags(['script', 'style'])
+        return tree
+    return BeautifulSoup(html, backend)
+
+def cascade_extract(tree, backend):
+    # the select_one-per-selector version get_content used to run, kept to compare against
+    if backend == 'selectolax':
+        for selector in Parser.article_selectors:
+            element = tree.css_first(selector)
+            if element:
+                content = element.text(strip=True)
+                if content:
+                    return content
+                break
+        return ' '.join([p.text(strip=True) for p in tree.css('p')])
+
+    for script in tree(["script", "style"]):
+        script.decompose()
+    for selector in Parser.article_selectors:
+        element = tree.select_one(selector)
+        if element:
+            content = element.get_text(strip=True)
+            if content:
+                return content
+            break
+    return ' '.join([p.get_text(strip=True) for p in tree.find_all('p')])
+
+def bench_extractor(rounds=20):
+    # parsing is timed separately in 'parsers', this only times picking the article out of a parsed page
+    pages = sample_pages()
+    for backend in Parser.available():
+        extract = Parser.lexbor_extract if backend == 'selectolax' else Parser.soup_extract
+        mismatched = [name for name, html in pages.items() if extract(parse(html, backend)) != cascade_extract(parse(html, backend), backend)]
+        trees = [parse(html, backend) for _ in range(rounds) for html in pages.values()]
+        start = time.perf_counter()
+        for tree in trees:
+            cascade_extract(tree, backend)
+        cascade = time.perf_counter() - start
+        trees = [parse(html, backend) for _ in range(rounds) for html in pages.values()]
+        start = time.perf_counter()
+        for tree in trees:
+            extract(tree)
+        single = time.perf_counter() - start
+        print(f"{backend:12} cascade {cascade / rounds * 1000:8.2f} ms  single pass {single / rounds * 1000:8.2f} ms  speedup {cascade / single:.2f}x  {'same output' if not mismatched else f'DIFFERENT on {mismatched}'}")
+
+class PageHandler(LocalHandler):
+    pages = list(sample_pages().values())
+
+    def do_GET(self):
+        body = self.pages[int(self.path.strip('/')) % len(self.pages)].encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+def bench_pipeline(n=200):
+    import ScanGnews  # pulls in the gemini client, so only when this one runs
+    server = local_server(PageHandler)
+    RateLimiter.limiter.rate = 0
+    ScanGnews.content_cache = Cache.Cache('content', path=':memory:', ttl=0)  # nothing cached between runs
+    articles = [{'headline': str(i), 'link': f"http://127.0.0.1:{server.server_port}/{i}"} for i in range(n)]
+    workers = 1
+    while workers <= (os.cpu_count() or 1):
+        start = time.perf_counter()
+        asyncio.run(ScanGnews.fetch_all(articles, Config.max_concurrency, workers))
+        elapsed = time.perf_counter() - start
+        print(f"{workers:3} parse workers: {elapsed:.3f}s, {n / elapsed:.1f} articles/s")
+        workers *= 2
+    server.shutdown()
+
+class SearchHandler(LocalHandler):
+    # every query gets 100 cards, half of them shared with the query before it
+    queries = {}
+
+    def do_GET(self):
+        offset = self.queries.setdefault(self.path, len(self.queries)) * 50
+        body = "<html><body>" + "".join(f"<div class='m5k28'><a class='JtKRv' href='./read/{i}'>Headline {i}</a></div>" for i in range(offset, offset + 100)) + "</body></html>"
+        body = body.encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+def bench_search(limit=1000):
+    import ScanGnews
+    server = local_server(SearchHandler)
+    RateLimiter.limiter.rate = 0
+    ScanGnews.search_url = f"http://127.0.0.1:{server.server_port}/search"
+    start = time.perf_counter()
+    first = None
+    found = 0
+    for article in ScanGnews.iter_search('benchmark', 'html', days=limit // 50):
+        found += 1
+        if first is None:
+            first = time.perf_counter() - start
+        if found >= limit:
+            break
+    elapsed = time.perf_counter() - start
+    print(f"{found} unique articles in {elapsed:.3f}s ({found / elapsed:.1f}/s), first one after {first * 1000:.1f} ms")
+    server.shutdown()
+
+def search_fixtures(n=100):
+    # the same n stories as a google news search page and as its rss feed
+    # the page gets the kind of inline scripts and markup the real one is padded with
+    junk = "<script>AF_initDataCallback({key: 'ds:0', data: [" + "[\"x\", 1, null, [2, 3]], " * 3000 + "]});</script>"
+    cards = "".join(
+        f"<c-wiz><div class='m5k28'><article class='IFHyqb'><div class='XlKvRb'><a class='WwrzSb' href='./read/CBMi{i}'></a></div>"
+        f"<div class='vr1PYe'>Publisher {i}</div><a class='JtKRv' href='./read/CBMi{i}'>Headline number {i} about the news</a>"
+        f"<div class='UOVeFe'><time class='hvbAAd' datetime='2025-07-05T10:00:00Z'>1 hour ago</time></div></article></div></c-wiz>"
+        for i in range(n)
+    )
+    html = f"<html><head>{junk * 3}</head><body><nav>{'<a href=/x>Section</a>' * 100}</nav>{cards}{junk}</body></html>"
+    items = "".join(
+        f"<item><title>Headline number {i} about the news - Publisher {i}</title><link>https://news.google.com/rss/articles/CBMi{i}?oc=5</link>"
+        f"<guid isPermaLink='false'>CBMi{i}</guid><pubDate>Sat, 05 Jul 2025 10:00:00 GMT</pubDate><source url='https://p{i}.com'>Publisher {i}</source></item>"
+        for i in range(n)
+    )
+    rss = f"<?xml version='1.0' encoding='UTF-8'?><rss version='2.0'><channel><title>news</title>{items}</channel></rss>"
+    return html.encode('utf-8'), rss.encode('utf-8')
+
+def bench_feeds(rounds=50):
+    import Feeds
+    html, rss = search_fixtures()
+    start = time.perf_counter()
+    for _ in range(rounds):
+        html_found = len(Parser.news_cards(html.decode('utf-8')))
+    html_time = (time.perf_counter() - start) / rounds
+    start = time.perf_counter()
+    for _ in range(rounds):
+        rss_found = len(list(Feeds.parse_feed([rss[i:i + 16384] for i in range(0, len(rss), 16384)])))
+    rss_time = (time.perf_counter() - start) / rounds
+    print(f"html search page: {len(html) / 1024:8.1f} KB, {html_time * 1000:7.2f} ms, {html_found} articles ({Parser.pick()})")
+    print(f"rss feed:         {len(rss) / 1024:8.1f} KB, {rss_time * 1000:7.2f} ms, {rss_found} articles")
+
+# headlines the way google news returns them for a search, marked by hand as related (True) or not
+labelled_headlines = {
+    'interest rates': [
+        ("Fed holds interest rates steady as inflation cools", True),
+        ("Mortgage rates fall to lowest level this year", True),
+        ("Bank of England cuts interest rates for the first time since 2020", True),
+        ("What higher interest rates mean for your savings account", True),
+        ("ECB signals more interest rate cuts ahead", True),
+        ("Powell says the Fed is in no hurry to lower rates", True),
+        ("Treasury yields jump after strong jobs report", True),
+        ("Markets rally as traders bet on September rate cut", True),
+        ("Credit card interest rates hit record high", True),
+        ("Housing market cools under high borrowing costs", True),
+        ("Central bank keeps benchmark rate unchanged", True),
+        ("Why interest rates could stay higher for longer", True),
+        ("Taylor Swift announces new album release date", False),
+        ("Local high school wins state football championship", False),
+        ("Hurricane season forecast calls for above average storms", False),
+        ("New iPhone leaks show redesigned camera bump", False),
+        ("Recipe: the best summer tomato salad", False),
+        ("Scientists discover new species of deep sea fish", False),
+        ("Interest in vinyl records keeps growing among teens", False),
+        ("Cat rescued from tree after three days", False),
+    ],
+    'electric vehicles': [
+        ("Tesla cuts prices on electric vehicles again", True),
+        ("EV sales slow as buyers wait for cheaper models", True),
+        ("New battery plant to supply electric vehicle makers", True),
+        ("Charging stations expand along interstate highways", True),
+        ("Ford delays electric vehicle production plans", True),
+        ("Electric vehicles now make up 10% of new car sales", True),
+        ("Rivian unveils smaller, cheaper electric SUV", True),
+        ("Government extends tax credit for electric vehicles", True),
+        ("China's BYD overtakes rivals in global EV market", True),
+        ("Used electric vehicles lose value faster than gas cars", True),
+        ("Stock market closes higher on tech earnings", False),
+        ("Celebrity chef opens new restaurant downtown", False),
+        ("Wildfire forces thousands to evacuate", False),
+        ("Team trades star pitcher before deadline", False),
+        ("Electric bill assistance program opens applications", False),
+        ("Museum reopens after two year renovation", False),
+    ],
+}
+
+def bench_prefilter():
+    import Prefilter
+    for low, high in [(Config.prefilter_low, Config.prefilter_high), (0.05, 1.0), (0.05, 0.4)]:
+        decided = correct = total = 0
+        start = time.perf_counter()
+        for keyword, labelled in labelled_headlines.items():
+            truth = dict(labelled)
+            related, unrelated, unsure = Prefilter.split(list(truth), keyword, low, high)
+            decided += len(related) + len(unrelated)
+            correct += sum(truth[headline] for headline in related) + sum(not truth[headline] for headline in unrelated)
+            total += len(truth)
+        elapsed = time.perf_counter() - start
+        print(f"band ({low}, {high}): settled {decided}/{total} locally ({decided / total:.0%} fewer sent to gemini), precision {correct / max(decided, 1):.0%}, {elapsed * 1000:.2f} ms")
+
+class FlakyHandler(LocalHandler):
+    # the first request for every third page fails, either with a 503 or by dropping the connection
+    seen = set()
+
+    def do_GET(self):
+        page = int(self.path.strip('/'))
+        if page % 3 == 0 and self.path not in self.seen:
+            self.seen.add(self.path)
+            if page % 2:
+                self.send_response(503)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+            else:
+                self.close_connection = True
+            return
+        super().do_GET()
+
+def dead_server():
+    # accepts connections into the backlog and never answers, like a publisher that hangs
+    sock = socket.socket()
+    sock.bind(('127.0.0.1', 0))
+    sock.listen(1)
+    return sock
+
+def bench_retry(flaky=30, dead_pages=10):
+    import ScanGnews
+    RateLimiter.limiter.rate = 0
+    Config.timeout = 0.5  # read by Session when the clients are made
+    Session.close()
+    dead = dead_server()
+    dead_port = dead.getsockname()[1]
+    server = local_server(FlakyHandler)
+    urls = [f"http://127.0.0.1:{server.server_port}/{i}" for i in range(flaky)] + [f"http://127.0.0.1:{dead_port}/{i}" for i in range(dead_pages)]
+    one_by_one = lambda: [ScanGnews.get_content(url) for url in urls]
+    together = lambda: [article['content'] for article in asyncio.run(ScanGnews.fetch_all([{'headline': url, 'link': url} for url in urls], 8, 1))]
+    for mode, run in [('one by one', one_by_one), ('asyncio, 8 at a time', together)]:
+        for name, attempts, failures in [('no retries, no breaker', 1, float('inf')), ('retries + breaker', Config.retry_attempts, Config.breaker_failures)]:
+            FlakyHandler.seen = set()
+            ScanGnews.content_cache = Cache.Cache('content', path=':memory:', ttl=0)
+            Retry.policy = Retry.RetryPolicy(attempts=attempts, base=0.05)
+            Retry.breakers = Retry.HostBreakers(failures=failures)
+            start = time.perf_counter()
+            fetched = sum(1 for content in run() if content)
+            elapsed = time.perf_counter() - start
+            print(f"{mode:20} {name:22}: {fetched}/{flaky} flaky pages fetched, {elapsed:.2f}s, {Retry.stats()}")
+    server.shutdown()
+    dead.close()
+    Session.close()
+
+benchmarks = {
+    'session': bench_session,
+    'parsers': bench_parsers,
+    'extractor': bench_extractor,
+    'pipeline': bench_pipeline,
+    'search': bench_search,
+    'feeds': bench_feeds,
+    'prefilter': bench_prefilter,
+    'retry': bench_retry,
+}
+
+if __name__ == "__main__":
+    names = sys.argv[1:] or list(benchmarks)
+    for name in names:
+        print(f"--- {name}")
+        benchmarks[name]()
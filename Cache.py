@@ -0,0 +1,100 @@
+import sqlite3
+import threading
+import time
+import Config
+
+class Cache:
+    # small sqlite key/value store with a ttl and a size cap (least recently used goes first)
+    # the cap is for the whole file, every cache table in it counts towards it
+    # aliases map a url we asked for to the url it ended up at, entries are keyed by the latter
+    def __init__(self, table, path=None, ttl=None, max_bytes=None):
+        self.table = table
+        self.ttl = Config.cache_ttl if ttl is None else ttl
+        self.max_bytes = Config.cache_max_bytes if max_bytes is None else max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path or Config.cache_path, check_same_thread=False)
+        with self.lock, self.db:
+            self.db.execute(f"CREATE TABLE IF NOT EXISTS {table} (key TEXT PRIMARY KEY, value TEXT, etag TEXT, last_modified TEXT, created REAL, accessed REAL, size INTEGER)")
+            self.db.execute(f"CREATE TABLE IF NOT EXISTS {table}_alias (url TEXT PRIMARY KEY, key TEXT)")
+
+    def resolve(self, url):
+        with self.lock:
+            row = self.db.execute(f"SELECT key FROM {self.table}_alias WHERE url = ?", (url,)).fetchone()
+        return row[0] if row else url
+
+    def lookup(self, url):
+        # returns the entry even when stale so the caller can send a conditional request
+        key = self.resolve(url)
+        now = time.time()
+        with self.lock, self.db:
+            row = self.db.execute(f"SELECT value, etag, last_modified, created FROM {self.table} WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            value, etag, last_modified, created = row
+            fresh = now - created < self.ttl
+            if not fresh and not (etag or last_modified):
+                self.drop(self.table, key)
+                self.misses += 1
+                return None
+            self.db.execute(f"UPDATE {self.table} SET accessed = ? WHERE key = ?", (now, key))
+            if fresh:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return {'key': key, 'value': value, 'etag': etag, 'last_modified': last_modified, 'fresh': fresh}
+
+    def get(self, key):
+        entry = self.lookup(key)
+        if entry and entry['fresh']:
+            return entry['value']
+        return None
+
+    def put(self, key, value, etag=None, last_modified=None, url=None):
+        now = time.time()
+        with self.lock, self.db:
+            self.db.execute(f"INSERT OR REPLACE INTO {self.table} VALUES (?, ?, ?, ?, ?, ?, ?)", (key, value, etag, last_modified, now, now, len(value.encode('utf-8'))))
+            if url and url != key:
+                self.db.execute(f"INSERT OR REPLACE INTO {self.table}_alias VALUES (?, ?)", (url, key))
+            self.evict()
+
+    def revalidate(self, key):
+        # server said 304 so the stored copy is good for another ttl
+        with self.lock, self.db:
+            self.db.execute(f"UPDATE {self.table} SET created = ? WHERE key = ?", (time.time(), key))
+        self.revalidated += 1
+
+    def drop(self, table, key):
+        self.db.execute(f"DELETE FROM {table} WHERE key = ?", (key,))
+        self.db.execute(f"DELETE FROM {table}_alias WHERE key = ?", (key,))
+
+    def tables(self):
+        # the other caches sharing this file made their own tables, each with an _alias table next to it
+        names = {row[0] for row in self.db.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        return sorted(name for name in names if name + '_alias' in names)
+
+    def evict(self):
+        tables = self.tables()
+        total = sum(self.db.execute(f"SELECT COALESCE(SUM(size), 0) FROM {table}").fetchone()[0] for table in tables)
+        if total <= self.max_bytes:
+            return
+        entries = " UNION ALL ".join(f"SELECT '{table}', key, size, accessed FROM {table}" for table in tables)
+        for table, key, size, accessed in self.db.execute(f"{entries} ORDER BY accessed").fetchall():
+            self.drop(table, key)
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def validators(self, entry):
+        headers = {}
+        if entry and entry['etag']:
+            headers['If-None-Match'] = entry['etag']
+        if entry and entry['last_modified']:
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def stats(self):
+        return f"{self.hits} hits, {self.misses} misses ({self.revalidated} revalidated with 304)"
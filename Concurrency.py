@@ -0,0 +1,97 @@
+import asyncio
+import collections
+import time
+from urllib.parse import urlsplit
+import Config
+
+class Window:
+    def __init__(self, limit):
+        self.limit = limit
+        self.in_flight = 0
+        self.last_decrease = 0.0
+
+class AdaptiveLimiter:
+    # like a semaphore whose size moves on its own (aimd, the same idea tcp uses):
+    # +1 slot per full window of fast successes, halved on timeouts / 429 / 503
+    # every host gets its own window so a slow or dead publisher only holds and shrinks its own slots,
+    # maximum caps all of them together
+    def __init__(self, initial=None, minimum=None, maximum=None, latency_target=None):
+        self.initial = float(Config.aimd_initial if initial is None else initial)
+        self.minimum = Config.aimd_minimum if minimum is None else minimum
+        self.maximum = Config.max_concurrency if maximum is None else maximum
+        self.latency_target = Config.aimd_latency_target if latency_target is None else latency_target
+        self.windows = {}
+        self.in_flight = 0
+        self.waiters = collections.deque()  # (window, future) in arrival order
+        self.peak = self.initial
+        self.decreases = 0
+
+    def window(self, url):
+        host = urlsplit(url).netloc
+        window = self.windows.get(host)
+        if window is None:
+            window = self.windows[host] = Window(self.initial)
+        return window
+
+    def has_room(self, window):
+        return self.in_flight < self.maximum and window.in_flight < int(window.limit)
+
+    def take(self, window):
+        window.in_flight += 1
+        self.in_flight += 1
+
+    async def acquire(self, url):
+        # returns a slot to hand back to release
+        window = self.window(url)
+        if self.has_room(window) and not any(waiting is window for waiting, _ in self.waiters):
+            self.take(window)
+            return window, time.monotonic()
+        waiter = asyncio.get_running_loop().create_future()
+        self.waiters.append((window, waiter))
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # got woken up and cancelled at the same time, give the slot back
+                window.in_flight -= 1
+                self.in_flight -= 1
+                self.wake()
+            raise
+        return window, time.monotonic()
+
+    def release(self, slot, outcome):
+        # outcome is 'ok', 'overload' (timeout, 429, 503) or anything else for errors that say nothing about load
+        window, started = slot
+        window.in_flight -= 1
+        self.in_flight -= 1
+        now = time.monotonic()
+        if outcome == 'ok' and now - started <= self.latency_target:
+            window.limit = min(self.maximum, window.limit + 1 / window.limit)
+            self.peak = max(self.peak, window.limit)
+        elif outcome == 'overload' and started >= window.last_decrease:
+            # requests that were already out when we backed off dont count a second time
+            window.limit = max(self.minimum, window.limit / 2)
+            window.last_decrease = now
+            self.decreases += 1
+        self.wake()
+
+    def wake(self):
+        # first come first served, except a waiter whose host is full doesnt block the ones behind it
+        waiting = collections.deque()
+        while self.waiters and self.in_flight < self.maximum:
+            window, waiter = self.waiters.popleft()
+            if waiter.done():
+                continue
+            if window.in_flight < int(window.limit):
+                self.take(window)
+                waiter.set_result(None)
+            else:
+                waiting.append((window, waiter))
+        waiting.extend(self.waiters)
+        self.waiters = waiting
+
+    def stats(self):
+        if not self.windows:
+            return f"limit {self.initial:.1f} per host"
+        limits = [window.limit for window in self.windows.values()]
+        return f"limit {min(limits):.1f}-{max(limits):.1f} per host over {len(limits)} hosts (peak {self.peak:.1f}, backed off {self.decreases} times)"
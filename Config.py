@@ -0,0 +1,57 @@
+import os
+
+# everything can be overridden with env vars so i dont have to touch code
+max_concurrency = int(os.getenv('GNEWS_MAX_CONCURRENCY', 100))
+host_rate = float(os.getenv('GNEWS_HOST_RATE', 2))  # requests per second per host
+host_burst = int(os.getenv('GNEWS_HOST_BURST', 4))
+timeout = float(os.getenv('GNEWS_TIMEOUT', 10))
+user_agent = os.getenv('GNEWS_USER_AGENT', 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36')
+pool_max_connections = int(os.getenv('GNEWS_POOL_MAX_CONNECTIONS', 100))
+pool_keepalive_connections = int(os.getenv('GNEWS_POOL_KEEPALIVE_CONNECTIONS', 20))
+pool_keepalive_expiry = float(os.getenv('GNEWS_POOL_KEEPALIVE_EXPIRY', 30))
+cache_path = os.getenv('GNEWS_CACHE_PATH', 'gnews_cache.sqlite3')
+cache_ttl = float(os.getenv('GNEWS_CACHE_TTL', 6 * 60 * 60))
+cache_max_bytes = int(os.getenv('GNEWS_CACHE_MAX_MB', 100)) * 1024 * 1024  # for the whole cache file, all tables together
+gemini_model = os.getenv('GNEWS_GEMINI_MODEL', 'models/gemini-2.5-flash-lite-preview-06-17')
+filter_cache_ttl = float(os.getenv('GNEWS_FILTER_CACHE_TTL', 24 * 60 * 60))
+summary_cache_ttl = float(os.getenv('GNEWS_SUMMARY_CACHE_TTL', 12 * 60 * 60))
+parser = os.getenv('GNEWS_PARSER', 'auto')  # selectolax, lxml, html.parser or auto
+stream_pages = os.getenv('GNEWS_STREAM_PAGES', '1') == '1'  # stop downloading once the article is found
+max_page_bytes = int(os.getenv('GNEWS_MAX_PAGE_KB', 2048)) * 1024
+parse_workers = int(os.getenv('GNEWS_PARSE_WORKERS', os.cpu_count() or 1))
+parse_queue_depth = int(os.getenv('GNEWS_PARSE_QUEUE_DEPTH', 64))
+resolve_concurrency = int(os.getenv('GNEWS_RESOLVE_CONCURRENCY', 10))
+resolve_cache_ttl = float(os.getenv('GNEWS_RESOLVE_CACHE_TTL', 30 * 24 * 60 * 60))
+search_limit = int(os.getenv('GNEWS_SEARCH_LIMIT', 20))
+search_days = int(os.getenv('GNEWS_SEARCH_DAYS', 30))  # how far back to page when the first page isnt enough
+search_source = os.getenv('GNEWS_SEARCH_SOURCE', 'html')  # html, rss or both
+feed_urls = [url.strip() for url in os.getenv('GNEWS_FEEDS', '').split(',') if url.strip()]  # publisher rss/atom feeds the rss source also reads
+feed_cache_ttl = float(os.getenv('GNEWS_FEED_CACHE_TTL', 10 * 60))
+batch_workers = int(os.getenv('GNEWS_BATCH_WORKERS', 8))  # topics searched/filtered/summarized at once
+daemon_change_threshold = float(os.getenv('GNEWS_DAEMON_CHANGE_THRESHOLD', 0.2))  # share of articles that has to change before re-summarizing
+dedup_max_distance = int(os.getenv('GNEWS_DEDUP_MAX_DISTANCE', 6))  # simhash bits two articles can differ by and still count as the same
+dedup_bands = int(os.getenv('GNEWS_DEDUP_BANDS', 8))
+prefilter = os.getenv('GNEWS_PREFILTER', '1') == '1'  # decide obvious headlines locally before asking gemini
+prefilter_low = float(os.getenv('GNEWS_PREFILTER_LOW', -1))  # at or below this a headline is dropped without asking, off by default since wording like 'EV' scores 0
+prefilter_high = float(os.getenv('GNEWS_PREFILTER_HIGH', 1.0))  # at or above this it is kept without asking
+prompt_token_budget = int(os.getenv('GNEWS_PROMPT_TOKEN_BUDGET', 60000))  # most the summarize prompt can be
+min_article_tokens = int(os.getenv('GNEWS_MIN_ARTICLE_TOKENS', 150))  # below this an article is dropped instead of trimmed
+chars_per_token = int(os.getenv('GNEWS_CHARS_PER_TOKEN', 4))
+summarize_mode = os.getenv('GNEWS_SUMMARIZE_MODE', 'auto')  # single, mapreduce, or auto (mapreduce past map_reduce_threshold articles)
+map_reduce_threshold = int(os.getenv('GNEWS_MAP_REDUCE_THRESHOLD', 30))
+map_batch_size = int(os.getenv('GNEWS_MAP_BATCH_SIZE', 8))
+map_concurrency = int(os.getenv('GNEWS_MAP_CONCURRENCY', 4))
+map_cache_ttl = float(os.getenv('GNEWS_MAP_CACHE_TTL', 7 * 24 * 60 * 60))
+stream_summary = os.getenv('GNEWS_STREAM_SUMMARY', '1') == '1'  # print the summary as gemini writes it (single topic runs)
+aimd_initial = int(os.getenv('GNEWS_AIMD_INITIAL', 8))  # fetches per host to start from, each host adapts on its own, max_concurrency caps them all
+aimd_minimum = int(os.getenv('GNEWS_AIMD_MINIMUM', 1))
+aimd_latency_target = float(os.getenv('GNEWS_AIMD_LATENCY_TARGET', 3))  # seconds, slower fetches dont raise the limit
+retry_attempts = int(os.getenv('GNEWS_RETRY_ATTEMPTS', 3))  # tries per request, counting the first one
+retry_base = float(os.getenv('GNEWS_RETRY_BASE', 0.5))  # seconds, backoff doubles from here with jitter
+retry_cap = float(os.getenv('GNEWS_RETRY_CAP', 8))
+breaker_failures = int(os.getenv('GNEWS_BREAKER_FAILURES', 5))  # errors in a row before a host is skipped
+breaker_cooldown = float(os.getenv('GNEWS_BREAKER_COOLDOWN', 60))  # seconds before trying a skipped host again
+run_deadline = float(os.getenv('GNEWS_DEADLINE', 300))  # seconds for a whole run, 0 for no limit
+# share of the time left that each stage gets, in the order they run
+stage_budgets = {stage: float(share) for stage, share in (part.split(':') for part in os.getenv('GNEWS_STAGE_BUDGETS', 'search:0.15,filter:0.15,fetch:0.4,summarize:0.3').split(','))}
+stage_minimum = float(os.getenv('GNEWS_STAGE_MINIMUM', 5))  # seconds a stage gets even when the run is already late
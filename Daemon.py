@@ -0,0 +1,91 @@
+import argparse
+import asyncio
+import json
+import time
+import Config
+import Deadline
+import ScanGnews
+import Session
+
+# keeps running and polls each topic on its own schedule
+# the http pools, parse processes, gemini client and everything already fetched stay around between polls
+
+class Topic:
+    def __init__(self, keyword, every):
+        self.keyword = keyword
+        self.every = every
+        self.due = 0
+        self.links = set()
+        self.summarized = None  # links in the last summary, None until there is one
+
+def load_schedule(path):
+    # {"keyword": seconds between polls, ...}
+    with open(path, encoding='utf-8') as f:
+        return [Topic(keyword, float(every)) for keyword, every in json.load(f).items()]
+
+def changed(old, new):
+    if old is None:
+        return True
+    union = old | new
+    return bool(union) and len(old ^ new) / len(union) >= Config.daemon_change_threshold
+
+async def poll(topics, known, client, pool):
+    print(f"polling {', '.join(topic.keyword for topic in topics)}")
+    Deadline.start()  # every poll gets the same time limit as a normal run
+    with Deadline.stage('search'):
+        found = await asyncio.gather(*(asyncio.to_thread(ScanGnews.search_topic, topic.keyword) for topic in topics))
+    with Deadline.stage('filter'):
+        searched = await asyncio.gather(*(asyncio.to_thread(ScanGnews.filter_topic, results, topic.keyword) for results, topic in zip(found, topics)))
+    with Deadline.stage('fetch'):
+        per_topic = await ScanGnews.fetch_topics(searched, known, client, pool)
+
+    with Deadline.stage('summarize'):
+        for topic, articles_w_content in zip(topics, per_topic):
+            if articles_w_content is None:
+                # search failed, keep the last summary and links (and the content they point at) for next poll
+                continue
+            topic.links = {article['link'] for article in articles_w_content}
+            articles_w_content = ScanGnews.drop_duplicates(articles_w_content, topic.keyword)
+            if not changed(topic.summarized, topic.links):
+                print(f"'{topic.keyword}' hasnt changed enough, keeping the last summary")
+                continue
+            try:
+                summary, cache_hit = await asyncio.to_thread(ScanGnews.summarize, articles_w_content, topic.keyword)
+            except Exception as e:
+                # the old summary file stays and summarized isnt updated, so the next poll tries again
+                print(f"error summarizing '{topic.keyword}': {e}")
+                continue
+            ScanGnews.to_file(summary, topic.keyword, cache_hit)
+            topic.summarized = topic.links
+
+async def serve(topics):
+    known = {}  # publisher url -> content, only for articles some topic still has
+    async with Session.async_client() as client:
+        with ScanGnews.parse_executor(Config.parse_workers) as pool:
+            while True:
+                now = time.monotonic()
+                due = [topic for topic in topics if topic.due <= now]
+                if not due:
+                    await asyncio.sleep(min(topic.due for topic in topics) - now)
+                    continue
+                start = time.time()
+                try:
+                    await poll(due, known, client, pool)
+                except Exception as e:
+                    print(f"error {e}")
+                for topic in due:
+                    topic.due = time.monotonic() + topic.every
+                current = set().union(*(topic.links for topic in topics))
+                for link in list(known):
+                    if link not in current:
+                        del known[link]
+                print(f"poll took {time.time()-start:.4f} seconds, {len(known)} articles kept, fetch concurrency {ScanGnews.fetch_limiter.stats()}, {Deadline.stats()}")
+
+if __name__ == "__main__":
+    args = argparse.ArgumentParser(description="keep polling google news topics and update their summaries")
+    args.add_argument('schedule', help='json file mapping each topic to seconds between polls')
+    args = args.parse_args()
+    try:
+        asyncio.run(serve(load_schedule(args.schedule)))
+    except KeyboardInterrupt:
+        print("stopped")
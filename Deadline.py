@@ -0,0 +1,106 @@
+import asyncio
+import time
+from contextlib import contextmanager
+import Config
+
+class RunDeadline:
+    # one clock for the whole run, split into stage budgets
+    # each stage gets its share of whatever time is left, so time an early stage doesnt use goes to the later ones
+    def __init__(self, total=None, budgets=None):
+        self.total = Config.run_deadline if total is None else total
+        self.budgets = Config.stage_budgets if budgets is None else budgets
+        self.started = time.monotonic()
+        self.stage_name = None
+        self.stage_end = None
+        self.spent = {}
+        self.given = {}
+
+    def left(self):
+        if self.total <= 0:
+            return None
+        return max(0.0, self.started + self.total - time.monotonic())
+
+    def budget(self, name):
+        left = self.left()
+        if left is None:
+            return None
+        names = list(self.budgets)
+        later = sum(self.budgets[n] for n in names[names.index(name):])
+        return max(Config.stage_minimum, left * self.budgets[name] / later)
+
+    @contextmanager
+    def stage(self, name):
+        budget = self.budget(name)
+        self.given[name] = budget
+        self.stage_name = name
+        self.stage_end = None if budget is None else time.monotonic() + budget
+        started = time.monotonic()
+        try:
+            yield budget
+        finally:
+            self.spent[name] = self.spent.get(name, 0) + time.monotonic() - started
+            self.stage_name = self.stage_end = None
+
+    def remaining(self):
+        # seconds left in the current stage (or the run outside of one), None when there is no limit
+        if self.stage_end is None:
+            return self.left()
+        return max(0.0, self.stage_end - time.monotonic())
+
+    def stats(self):
+        if self.total <= 0:
+            return "no deadline"
+        stages = ", ".join(f"{name} {self.spent[name]:.1f}s of {self.given[name]:.1f}s" for name in self.budgets if name in self.spent)
+        return f"{stages}, {time.monotonic() - self.started:.1f}s of {self.total:.0f}s used"
+
+run = RunDeadline(total=0)  # no limit until a run starts one
+
+def start(total=None):
+    global run
+    run = RunDeadline(total)
+    return run
+
+def stage(name):
+    return run.stage(name)
+
+def remaining():
+    return run.remaining()
+
+def expired():
+    left = run.remaining()
+    return left is not None and left <= 0
+
+def request_options(share=1.0):
+    # for gemini calls, so a slow response cant run past the stage
+    left = run.remaining()
+    return {} if left is None else {'timeout': max(left * share, 1.0)}
+
+def iterate(items):
+    # passes a lazy iterator through until the stage is out of time, so no more pages get requested
+    for item in items:
+        if expired():
+            print(f"{run.stage_name} budget ran out, stopping early")
+            return
+        yield item
+
+async def gather(aws):
+    # like asyncio.gather but only until the stage is out of time
+    # whatever hasnt finished by then is cancelled and comes back as None
+    tasks = [asyncio.ensure_future(aw) for aw in aws]
+    if not tasks:
+        return []
+    try:
+        done, late = await asyncio.wait(tasks, timeout=remaining())
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        raise
+    for task in late:
+        task.cancel()
+    if late:
+        await asyncio.gather(*late, return_exceptions=True)
+        print(f"{run.stage_name} budget ran out, cancelled {len(late)} of {len(tasks)} unfinished")
+    return [task.result() if task in done else None for task in tasks]
+
+def stats():
+    return run.stats()
@@ -0,0 +1,48 @@
+import hashlib
+import re
+import Config
+
+# wire stories (ap, reuters...) get republished everywhere under slightly different headlines
+# simhash each article and bucket the hashes by band so only likely matches get compared
+
+bits = 64
+word = re.compile(r'\w+')
+
+def shingles(text, size=3):
+    words = word.findall(text.lower())
+    if len(words) < size:
+        return [' '.join(words)] if words else []
+    return [' '.join(words[i:i + size]) for i in range(len(words) - size + 1)]
+
+def simhash(text):
+    hashes = [format(int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest(), 'big'), '064b') for shingle in shingles(text)]
+    # counting down the columns of the bit strings is much faster than shifting every hash 64 times
+    half = len(hashes) / 2
+    return int(''.join('1' if column.count('1') > half else '0' for column in zip(*hashes)) or '0', 2)
+
+def article_hash(article):
+    return simhash(f"{article['headline']} {article.get('content', '')}")
+
+def dedupe(articles, max_distance=None, bands=None):
+    # returns (kept articles, how many were dropped), the first article of each cluster is kept
+    # with max_distance differing bits and more bands than that, two near duplicates always share a band
+    max_distance = Config.dedup_max_distance if max_distance is None else max_distance
+    bands = bands or Config.dedup_bands
+    width = bits // bands
+    mask = (1 << width) - 1
+    buckets = {}
+    kept = []
+    for article in articles:
+        h = article_hash(article)
+        keys = [(band, h >> band * width & mask) for band in range(bands)]
+        duplicate = any(
+            bin(h ^ other).count('1') <= max_distance
+            for key in keys
+            for other in buckets.get(key, ())
+        )
+        if duplicate:
+            continue
+        kept.append(article)
+        for key in keys:
+            buckets.setdefault(key, []).append(h)
+    return kept, len(articles) - len(kept)
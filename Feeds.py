@@ -0,0 +1,80 @@
+import json
+import re
+import xml.etree.ElementTree as ET
+import Cache
+import Config
+import Retry
+import Session
+
+# rss/atom is a lot smaller than the search page and doesnt break when google renames its css classes
+feed_cache = Cache.Cache('feeds', ttl=Config.feed_cache_ttl)
+gnews_rss_url = "https://news.google.com/rss/search"
+atom = '{http://www.w3.org/2005/Atom}'
+
+def parse_feed(chunks):
+    # streams items out of rss or atom as the bytes come in, and throws each one away once read
+    parser = ET.XMLPullParser(events=('end',))
+    for chunk in chunks:
+        parser.feed(chunk)
+        for event, element in parser.read_events():
+            if element.tag == 'item':
+                headline = (element.findtext('title') or '').strip()
+                link = (element.findtext('link') or '').strip()
+            elif element.tag == f'{atom}entry':
+                headline = (element.findtext(f'{atom}title') or '').strip()
+                link = ''
+                for link_tag in element.iter(f'{atom}link'):
+                    if link_tag.get('rel', 'alternate') == 'alternate':
+                        link = link_tag.get('href', '')
+                        break
+            else:
+                continue
+            element.clear()
+            if headline and link:
+                yield {
+                    'headline': headline,
+                    'link': link
+                }
+    parser.close()
+
+def iter_feed(url, params=None):
+    key = url if not params else f"{url}?{json.dumps(params, sort_keys=True)}"
+    entry = feed_cache.lookup(key)
+    if entry and entry['fresh']:
+        yield from json.loads(entry['value'])
+        return
+
+    def attempt():
+        with Session.stream(url, params=params, headers=feed_cache.validators(entry)) as response:
+            if response.status_code == 304:
+                return None, response
+            response.raise_for_status()
+            # feeds are small, so the whole thing is read and cached before handing anything out
+            # otherwise a caller that stops early (scan_gnews does) means it never gets cached
+            return list(parse_feed(response.iter_bytes())), response
+
+    articles, response = Retry.call(url, attempt)
+    if articles is None:
+        feed_cache.revalidate(key)
+        yield from json.loads(entry['value'])
+        return
+    feed_cache.put(key, json.dumps(articles), response.headers.get('ETag'), response.headers.get('Last-Modified'))
+    yield from articles
+
+def iter_gnews_rss(keyword):
+    return iter_feed(gnews_rss_url, {'q': keyword, 'hl': 'en-US', 'gl': 'US', 'ceid': 'US:en'})
+
+def iter_publisher_feeds(keyword, urls=None):
+    # publisher feeds arent searches, so only items with a keyword word in the headline come through
+    # the gemini filter still gets the final say like with everything else
+    terms = [term for term in re.findall(r'\w+', keyword.lower()) if len(term) > 2] or [keyword.lower()]
+    for url in Config.feed_urls if urls is None else urls:
+        try:
+            articles = list(iter_feed(url))
+        except Exception as e:
+            print(f"skipping feed {url}: {e}")
+            continue
+        for article in articles:
+            headline = article['headline'].lower()
+            if any(re.search(rf'\b{re.escape(term)}', headline) for term in terms):
+                yield article
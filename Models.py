@@ -0,0 +1,42 @@
+import os
+import threading
+import time
+import google.generativeai as genai
+import Config
+
+# configures gemini once and hands out one model object per model name
+# the objects are safe to share between threads, and generate_content_async works on them too
+
+_models = {}
+_lock = threading.Lock()
+_configured = False
+setup_time = 0.0
+lookups = 0
+
+def get_api_key():
+    api_key = os.getenv('GEMINI_API_KEY') #itsa secret :)
+    if not api_key:
+        raise ValueError("key not put")
+    return api_key
+
+def get(name=None):
+    global _configured, setup_time, lookups
+    name = name or Config.gemini_model
+    start = time.perf_counter()
+    model = _models.get(name)
+    if model is None:
+        with _lock:
+            if not _configured:
+                genai.configure(api_key=get_api_key())
+                _configured = True
+            model = _models.get(name)
+            if model is None:
+                model = _models[name] = genai.GenerativeModel(name)
+    with _lock:
+        setup_time += time.perf_counter() - start
+        lookups += 1
+    return model
+
+def stats():
+    per_call = setup_time / lookups * 1000 if lookups else 0
+    return f"{len(_models)} model handles for {lookups} calls, {setup_time * 1000:.2f} ms setup ({per_call:.3f} ms per call)"
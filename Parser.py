@@ -0,0 +1,183 @@
+import codecs
+import re
+from html.parser import HTMLParser
+from bs4 import BeautifulSoup
+import Config
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+
+try:
+    import lxml
+except ImportError:
+    lxml = None
+
+article_selectors = ['article', '.article-content', '.post-content', '.entry-content', '.content', '[role="main"]', 'main','.story-body', '.article-body']
+max_chars = 5000
+
+# article_selectors are all a tag, a class or role="main", so a container's rank can be looked up
+# straight from its tag/class/role instead of running every selector against every element
+tag_rank, class_rank, role_rank = {}, {}, {}
+for rank, selector in enumerate(article_selectors):
+    if selector.startswith('.'):
+        class_rank.setdefault(selector[1:], rank)
+    elif selector.startswith('[role='):
+        role_rank.setdefault(selector[7:-2], rank)
+    else:
+        tag_rank.setdefault(selector, rank)
+
+def container_rank(tag, classes, role):
+    rank = tag_rank.get(tag, len(article_selectors))
+    for name in classes:
+        rank = min(rank, class_rank.get(name, rank))
+    if role is not None:
+        rank = min(rank, role_rank.get(role, rank))
+    return rank
+
+def pick_container(elements, rank_of, is_paragraph, text, all_paragraphs):
+    # elements come in document order, so the first one seen for each rank is what select_one would give
+    # and the lowest rank wins, same as walking article_selectors one by one
+    best, best_rank = None, len(article_selectors)
+    paragraphs = []
+    for element in elements:
+        rank = rank_of(element)
+        if rank < best_rank:
+            best, best_rank = element, rank
+            if rank == 0:
+                break
+        elif best is None and is_paragraph(element):
+            paragraphs.append(element)
+
+    if best is not None:
+        content = text(best)
+        if content:
+            return content
+        paragraphs = all_paragraphs()  # the old cascade fell back to every <p> on the page here
+    return ' '.join([text(p) for p in paragraphs])
+
+class StreamWatcher(HTMLParser):
+    # follows a page while it downloads and says when the rest of it can't change article_text
+    # that's once the first <article> has closed with text in it (it always wins the cascade) or holds more than max_chars
+    def __init__(self, encoding='utf-8'):
+        super().__init__(convert_charrefs=True)
+        self.decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+        self.depth = 0  # how many <article> tags deep we are, 0 when outside
+        self.seen_article = False
+        self.chars = 0
+        self.done = False
+
+    def feed_bytes(self, chunk):
+        if not self.done and not (self.seen_article and self.depth == 0):
+            self.feed(self.decoder.decode(chunk))
+        return self.done
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'article' and (self.depth or not self.seen_article):
+            self.depth += 1
+            self.seen_article = True
+
+    def handle_endtag(self, tag):
+        if tag == 'article' and self.depth:
+            self.depth -= 1
+            if self.depth == 0:
+                # an empty one sends article_text to every <p> on the page, so then all of it is needed
+                self.done = self.chars > 0
+
+    def handle_data(self, data):
+        if self.depth and self.cdata_elem is None:  # cdata_elem is set inside script/style
+            self.chars += len(re.sub(r'\s+', ' ', data.strip()))  # article_text collapses whitespace, so count it the same way
+            if self.chars > max_chars + 100:  # a little extra in case the last text node got cut off
+                self.done = True
+
+def soup_article(html, features):
+    return soup_extract(BeautifulSoup(html, features))
+
+def soup_extract(soup):
+    # bs4 already leaves script/style strings out of get_text so nothing needs decomposing
+    return pick_container(
+        (element for element in soup.descendants if element.name),
+        lambda element: container_rank(element.name, element.get('class') or (), element.get('role')),
+        lambda element: element.name == 'p',
+        lambda element: element.get_text(strip=True),
+        lambda: soup.find_all('p'),
+    )
+
+def soup_cards(html, features):
+    soup = BeautifulSoup(html, features)
+    cards = []
+    for card in soup.find_all('div', class_='m5k28'):
+        a_tag = card.find('a', class_='JtKRv')
+        if not a_tag or not a_tag.has_attr('href'):
+            continue
+        cards.append((a_tag.get_text(strip=True), a_tag['href']))
+    return cards
+
+def lexbor_article(html):
+    tree = LexborHTMLParser(html)
+    tree.strip_tags(['script', 'style'])
+    return lexbor_extract(tree)
+
+def lexbor_extract(tree):
+    return pick_container(
+        tree.css(container_selector),
+        lexbor_rank,
+        lambda node: node.tag == 'p',
+        lambda node: node.text(strip=True),
+        lambda: tree.css('p'),
+    )
+
+def lexbor_rank(node):
+    attributes = node.attributes
+    return container_rank(node.tag, (attributes.get('class') or '').split(), attributes.get('role'))
+
+# lexbor does the walking in C, this just narrows it down to containers and paragraphs
+container_selector = ', '.join(article_selectors + ['p'])
+
+def lexbor_cards(html):
+    tree = LexborHTMLParser(html)
+    cards = []
+    for card in tree.css('div.m5k28'):
+        a_tag = card.css_first('a.JtKRv')
+        if not a_tag or a_tag.attributes.get('href') is None:
+            continue
+        cards.append((a_tag.text(strip=True), a_tag.attributes['href']))
+    return cards
+
+backends = {
+    'selectolax': (lexbor_article, lexbor_cards),
+    'lxml': (lambda html: soup_article(html, 'lxml'), lambda html: soup_cards(html, 'lxml')),
+    'html.parser': (lambda html: soup_article(html, 'html.parser'), lambda html: soup_cards(html, 'html.parser')),
+}
+
+def available():
+    names = []
+    if LexborHTMLParser is not None:
+        names.append('selectolax')
+    if lxml is not None:
+        names.append('lxml')
+    names.append('html.parser')
+    return names
+
+def pick(backend=None):
+    backend = backend or Config.parser
+    if backend not in backends and backend != 'auto':
+        raise ValueError(f"unknown parser {backend}")
+    names = available()
+    if backend in names:
+        return backend
+    return names[0]  # auto, or the one asked for isnt installed
+
+def article_text(html, backend=None):
+    content = backends[pick(backend)][0](html)
+    content = re.sub(r'\s+', ' ', content)
+    content = content.strip()
+
+    if len(content) > max_chars:
+        content = content[:max_chars] + "..."
+
+    return content
+
+def news_cards(html, backend=None):
+    return backends[pick(backend)][1](html)
@@ -0,0 +1,67 @@
+import re
+import Config
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# cheap local relevance check so gemini only sees headlines that could go either way
+# headlines with every keyword term are kept, ones sharing nothing with the keyword or with
+# those sure matches are dropped, and the rest in between go to the llm
+
+stopwords = set("a an and are as at be by for from has have he her his in is it its of on or that the their to was were will with after over new says say".split())
+word = re.compile(r"[a-z0-9]+")
+
+def tokens(text):
+    return [w[:-1] if len(w) > 3 and w.endswith('s') else w for w in word.findall(text.lower()) if w not in stopwords]
+
+def scores(headlines, keyword):
+    # returns one score per headline, 1.0 means every keyword term is in it
+    terms = {}
+    docs = [tokens(headline) for headline in headlines]
+    query = tokens(keyword)
+    for doc in docs + [query]:
+        for term in doc:
+            terms.setdefault(term, len(terms))
+    if not query or not docs:
+        return np.zeros(len(headlines))
+
+    counts = np.zeros((len(docs), len(terms)))
+    for row, doc in enumerate(docs):
+        for term in doc:
+            counts[row, terms[term]] += 1
+    present = counts > 0
+    idf = np.log((len(docs) + 1) / (present.sum(axis=0) + 1)) + 1
+
+    # how much of the keyword (by idf weight) shows up in each headline
+    query_vec = np.zeros(len(terms))
+    query_vec[[terms[term] for term in set(query)]] = idf[[terms[term] for term in set(query)]]
+    coverage = present @ query_vec / query_vec.sum()
+
+    # cosine to the average of the headlines that have the whole keyword, catches related ones that word it differently
+    tfidf = counts * idf
+    tfidf /= np.maximum(np.linalg.norm(tfidf, axis=1, keepdims=True), 1e-12)
+    sure = coverage >= 1 - 1e-9
+    if sure.any():
+        centroid = tfidf[sure].mean(axis=0)
+        similarity = tfidf @ (centroid / max(np.linalg.norm(centroid), 1e-12))
+    else:
+        similarity = np.zeros(len(docs))
+    return np.maximum(coverage, similarity)
+
+def split(headlines, keyword, low=None, high=None):
+    # returns (related, unrelated, unsure) lists of headlines
+    low = Config.prefilter_low if low is None else low
+    high = Config.prefilter_high if high is None else high
+    if np is None or not Config.prefilter:
+        return [], [], list(headlines)
+    related, unrelated, unsure = [], [], []
+    for headline, score in zip(headlines, scores(headlines, keyword)):
+        if score >= high - 1e-9:
+            related.append(headline)
+        elif score <= low:
+            unrelated.append(headline)
+        else:
+            unsure.append(headline)
+    return related, unrelated, unsure
@@ -0,0 +1,61 @@
+import threading
+import Config
+
+# keeps the summarize prompt inside a token budget instead of sending everything we fetched
+# tokens are estimated from characters, which is close enough for english news text
+
+usage = {'prompt': 0, 'output': 0, 'calls': 0}
+_lock = threading.Lock()
+
+def estimate_tokens(text):
+    return len(text) // Config.chars_per_token + 1
+
+def article_block(i, article, content):
+    return f"\n\n Article {i}: {article['headline']} \nSource: {article['link']}\nContent: {content}\n"
+
+def fair_share(lengths, budget):
+    # water filling: short articles keep everything and what they leave over is split among the long ones
+    remaining = budget
+    for left, length in zip(range(len(lengths), 0, -1), sorted(lengths)):
+        share = remaining / left
+        if length > share:
+            return int(share)
+        remaining -= length
+    return max(lengths, default=0)
+
+def trim(content, tokens):
+    limit = tokens * Config.chars_per_token
+    if len(content) <= limit:
+        return content
+    cut = content[:limit]
+    return cut[:cut.rfind(' ')] + "..." if ' ' in cut else cut + "..."
+
+def pack(articles, budget):
+    # returns (articles text, stats), articles are assumed to be in rank order so the last ones go first
+    count = len(articles)
+    overhead = [estimate_tokens(article_block(i, article, '')) for i, article in enumerate(articles, 1)]
+    while count and sum(overhead[:count]) + count * Config.min_article_tokens > budget:
+        count -= 1
+    lengths = [estimate_tokens(article['content']) for article in articles[:count]]
+    share = fair_share(lengths, budget - sum(overhead[:count]))
+    blocks = [article_block(i, article, trim(article['content'], share)) for i, article in enumerate(articles[:count], 1)]
+    text = ''.join(blocks)
+    return text, {
+        'articles': count,
+        'dropped': len(articles) - count,
+        'trimmed': sum(length > share for length in lengths),
+        'tokens': estimate_tokens(text),
+    }
+
+def record(response):
+    # adds up what gemini says it actually used, if it says
+    metadata = getattr(response, 'usage_metadata', None)
+    if metadata is None:
+        return
+    with _lock:
+        usage['prompt'] += metadata.prompt_token_count or 0
+        usage['output'] += metadata.candidates_token_count or 0
+        usage['calls'] += 1
+
+def stats():
+    return f"{usage['calls']} gemini calls, {usage['prompt']} prompt tokens, {usage['output']} output tokens"
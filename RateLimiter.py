@@ -0,0 +1,57 @@
+import asyncio
+import threading
+import time
+from urllib.parse import urlsplit
+import Config
+
+class TokenBucket:
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self.tokens = self.burst
+        self.last = time.monotonic()
+
+    def reserve(self):
+        # takes a token now and returns how long the caller has to wait for it
+        # tokens can go negative so queued callers line up behind each other
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.last) * self.rate)
+        self.last = now
+        self.tokens -= 1
+        if self.tokens >= 0 or self.rate <= 0:
+            return 0
+        return -self.tokens / self.rate
+
+class HostLimiter:
+    # one bucket per host so different publishers dont slow each other down
+    def __init__(self, rate=None, burst=None):
+        self.rate = Config.host_rate if rate is None else rate
+        self.burst = Config.host_burst if burst is None else burst
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+    def delay(self, url):
+        host = urlsplit(url).hostname or ''
+        with self.lock:
+            bucket = self.buckets.get(host)
+            if bucket is None:
+                bucket = self.buckets[host] = TokenBucket(self.rate, self.burst)
+            return bucket.reserve()
+
+    def wait(self, url):
+        delay = self.delay(url)
+        if delay > 0:
+            time.sleep(delay)
+
+    async def wait_async(self, url):
+        delay = self.delay(url)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+limiter = HostLimiter()
+
+def wait(url):
+    limiter.wait(url)
+
+async def wait_async(url):
+    await limiter.wait_async(url)
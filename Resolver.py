@@ -0,0 +1,95 @@
+import asyncio
+import base64
+import json
+import re
+from urllib.parse import urlsplit
+import Cache
+import Config
+import Deadline
+import RateLimiter
+import Session
+
+# google news links point at news.google.com, which only sends you to the publisher with javascript.
+# this turns them into the publisher url up front and remembers the answer
+link_cache = Cache.Cache('resolved', ttl=Config.resolve_cache_ttl)
+batch_url = 'https://news.google.com/_/DotsSplashUi/data/batchexecute'
+
+def article_id(link):
+    parts = urlsplit(link)
+    if parts.hostname != 'news.google.com':
+        return None
+    path = parts.path.split('/')
+    for marker in ('articles', 'read'):
+        if marker in path[:-1]:
+            return path[path.index(marker) + 1]
+    return None
+
+def decode_id(article_id):
+    # older ids are just base64'd protobuf with the url inside, no request needed
+    try:
+        raw = base64.urlsafe_b64decode(article_id + '=' * (-len(article_id) % 4))
+    except ValueError:
+        return None
+    if not raw.startswith(b'\x08\x13\x22'):
+        return None
+    raw = raw[3:]
+    length, shift, i = 0, 0, 0
+    while i < len(raw):  # varint length of the url
+        length |= (raw[i] & 0x7f) << shift
+        shift += 7
+        i += 1
+        if not raw[i - 1] & 0x80:
+            break
+    url = raw[i:i + length].decode('utf-8', errors='replace')
+    return url if url.startswith('http') else None
+
+async def decode_remote(client, article_id):
+    # newer ids have to be traded in, the article page has the signature and timestamp to do it
+    page_url = f'https://news.google.com/articles/{article_id}'
+    await RateLimiter.wait_async(page_url)
+    page = await client.get(page_url)
+    signature = re.search(r'data-n-a-sg="([^"]+)"', page.text)
+    timestamp = re.search(r'data-n-a-ts="([^"]+)"', page.text)
+    if not signature or not timestamp:
+        return None
+
+    payload = [
+        'Fbv4je',
+        f'["garturlreq",[["X","X",["X","X"],null,null,1,1,"US:en",null,1,null,null,null,null,null,0,1],"X","X",1,[1,1,1],1,1,null,0,0,null,0],"{article_id}",{timestamp.group(1)},"{signature.group(1)}"]',
+    ]
+    await RateLimiter.wait_async(batch_url)
+    response = await client.post(batch_url, data={'f.req': json.dumps([[payload]])}, headers={'Content-Type': 'application/x-www-form-urlencoded;charset=UTF-8'})
+    response.raise_for_status()
+    data = json.loads(response.text.split('\n\n', 1)[1])
+    return json.loads(data[0][2])[1]
+
+async def resolve(client, link, semaphore):
+    cached = link_cache.get(link)
+    if cached is not None:
+        return cached
+    gid = article_id(link)
+    if gid is None:
+        return link
+    url = decode_id(gid)
+    if url is None:
+        async with semaphore:
+            try:
+                url = await decode_remote(client, gid)
+            except Exception as e:
+                url = None
+    if url is None:
+        return link  # leave it, the fetch will just go through google like before
+    link_cache.put(link, url)
+    return url
+
+async def resolve_all(articles, concurrency=None, client=None):
+    if client is None:
+        async with Session.async_client() as client:
+            return await resolve_all(articles, concurrency, client)
+    semaphore = asyncio.Semaphore(concurrency or Config.resolve_concurrency)
+    links = await Deadline.gather(resolve(client, article['link'], semaphore) for article in articles)
+    # anything not resolved in time keeps its google link
+    return [{**article, 'link': link or article['link']} for article, link in zip(articles, links)]
+
+def resolve_links(articles, concurrency=None):
+    return asyncio.run(resolve_all(articles, concurrency))
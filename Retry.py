@@ -0,0 +1,148 @@
+import asyncio
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+import httpx
+import Config
+
+retry_statuses = {429, 500, 502, 503, 504}
+
+class CircuitOpen(Exception):
+    pass
+
+class Breaker:
+    # closed until `failures` errors in a row, then open (fail fast) for `cooldown` seconds,
+    # after that one trial request is let through and its result closes or reopens it
+    def __init__(self, failures, cooldown):
+        self.failures = failures
+        self.cooldown = cooldown
+        self.errors = 0
+        self.opened = None
+        self.probing = False
+
+    def allow(self):
+        if self.opened is None:
+            return True
+        if self.probing or time.monotonic() - self.opened < self.cooldown:
+            return False
+        self.probing = True
+        return True
+
+    def record(self, ok):
+        # ok=None means the request never finished (cancelled), so it says nothing about the host
+        self.probing = False
+        if ok:
+            self.errors = 0
+            self.opened = None
+        elif ok is not None:
+            self.errors += 1
+            if self.errors >= self.failures:
+                self.opened = time.monotonic()
+
+class HostBreakers:
+    # one breaker per host (and port) so a dead publisher only fails its own articles fast
+    def __init__(self, failures=None, cooldown=None):
+        self.failures = Config.breaker_failures if failures is None else failures
+        self.cooldown = Config.breaker_cooldown if cooldown is None else cooldown
+        self.breakers = {}
+        self.lock = threading.Lock()
+        self.skipped = 0
+        self.trips = 0
+
+    def breaker(self, url):
+        host = urlsplit(url).netloc
+        breaker = self.breakers.get(host)
+        if breaker is None:
+            breaker = self.breakers[host] = Breaker(self.failures, self.cooldown)
+        return breaker
+
+    def allow(self, url):
+        with self.lock:
+            if self.breaker(url).allow():
+                return True
+            self.skipped += 1
+            return False
+
+    def record(self, url, ok):
+        with self.lock:
+            breaker = self.breaker(url)
+            was_open = breaker.opened is not None
+            breaker.record(ok)
+            if breaker.opened is not None and not was_open:
+                self.trips += 1
+
+class RetryPolicy:
+    def __init__(self, attempts=None, base=None, cap=None):
+        self.attempts = max(1, Config.retry_attempts if attempts is None else attempts)
+        self.base = Config.retry_base if base is None else base
+        self.cap = Config.retry_cap if cap is None else cap
+        self.retries = 0
+
+    def delay(self, attempt, result):
+        # full jitter so a batch of failed requests doesnt come back in lockstep
+        response = getattr(result, 'response', result)
+        if isinstance(response, httpx.Response):
+            retry_after = response.headers.get('Retry-After', '')
+            if retry_after.isdigit():
+                return min(float(retry_after), self.cap)
+        return random.uniform(0, min(self.cap, self.base * 2 ** attempt))
+
+policy = RetryPolicy()
+breakers = HostBreakers()
+
+def failed(result):
+    # only things worth trying again count: connection problems, timeouts and overloaded / broken servers
+    # a 404 or a parse error means the host answered fine
+    if isinstance(result, httpx.HTTPStatusError):
+        result = result.response
+    if isinstance(result, httpx.Response):
+        return result.status_code in retry_statuses
+    return isinstance(result, httpx.TransportError)
+
+def call(url, attempt):
+    # attempt() makes one request and returns its result or raises, retryable failures get tried again
+    for n in range(policy.attempts):
+        if not breakers.allow(url):
+            raise CircuitOpen(f"too many failures from {urlsplit(url).netloc}, skipping it for now")
+        try:
+            result = attempt()
+        except Exception as e:
+            result = e
+        except BaseException:
+            breakers.record(url, None)
+            raise
+        bad = failed(result)
+        breakers.record(url, not bad)
+        if not bad or n == policy.attempts - 1:
+            break
+        policy.retries += 1
+        time.sleep(policy.delay(n, result))
+    if isinstance(result, Exception):
+        raise result
+    return result
+
+async def call_async(url, attempt):
+    # same as call but attempt() returns a coroutine
+    for n in range(policy.attempts):
+        if not breakers.allow(url):
+            raise CircuitOpen(f"too many failures from {urlsplit(url).netloc}, skipping it for now")
+        try:
+            result = await attempt()
+        except Exception as e:
+            result = e
+        except BaseException:
+            breakers.record(url, None)
+            raise
+        bad = failed(result)
+        breakers.record(url, not bad)
+        if not bad or n == policy.attempts - 1:
+            break
+        policy.retries += 1
+        await asyncio.sleep(policy.delay(n, result))
+    if isinstance(result, Exception):
+        raise result
+    return result
+
+def stats():
+    return f"{policy.retries} retries, {breakers.trips} circuit trips, {breakers.skipped} requests skipped on open circuits"
@@ -1,118 +1,381 @@
-import requests
-from bs4 import BeautifulSoup
-import re
 import google.generativeai as genai
 import time
 import os
-from concurrent.futures import ThreadPoolExecutor
-
-def get_api_key():
-    api_key = os.getenv('GEMINI_API_KEY') #itsa secret :)
-    if not api_key:
-        raise ValueError("key not put")
-    return api_key
-
-def scan_gnews(keyword):
-    base_url = "https://news.google.com/search"
-    params = {'q': keyword, 'hl': 'en-US', 'gl': 'US', 'ceid': 'US:en'}
-    response = requests.get(base_url, params=params)
-    soup = BeautifulSoup(response.text, 'html.parser')
-    articles = []
-
-
-    for card in soup.find_all('div', class_='m5k28'):
-        if len(articles) >= 20:  # for the sake of me free api limit
-            break
-        a_tag = card.find('a', class_='JtKRv')
-        if not a_tag or not a_tag.has_attr('href'):
-            continue
-        link = a_tag['href']
-        if link.startswith('./'):
-            link = 'https://news.google.com' + link[1:]
-        headline = a_tag.get_text(strip=True)
-        articles.append({
-            'headline': headline,
-            'link': link
-        })
-    return articles
+import argparse
+import asyncio
+import datetime
+import itertools
+import sys
+import tempfile
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import hashlib
+import json
+import httpx
+import Cache
+import Concurrency
+import Config
+import Deadline
+import Dedup
+import Feeds
+import Models
+import Parser
+import Prefilter
+import Prompt
+import RateLimiter
+import Resolver
+import Retry
+import Session
+
+content_cache = Cache.Cache('content')
+filter_cache = Cache.Cache('filter', ttl=Config.filter_cache_ttl)
+filter_prompt_version = 2  # bump when the filter prompt changes so old verdicts are ignored
+fetch_limiter = Concurrency.AdaptiveLimiter()  # lives as long as the process so what it learned carries over
+summary_cache = Cache.Cache('summary', ttl=Config.summary_cache_ttl)
+summary_prompt_version = 1
+map_cache = Cache.Cache('article_summary', ttl=Config.map_cache_ttl)
+map_prompt_version = 1
+
+search_url = "https://news.google.com/search"
+
+def search_pages(keyword, days):
+    # google news has no page parameter, so after the normal search it goes back a day at a time
+    yield keyword
+    today = datetime.date.today()
+    for back in range(days):
+        day = today - datetime.timedelta(days=back)
+        yield f"{keyword} after:{day - datetime.timedelta(days=1)} before:{day + datetime.timedelta(days=1)}"
+
+def iter_gnews(keyword, days=None):
+    # yields articles as each page is parsed
+    for page, query in enumerate(search_pages(keyword, Config.search_days if days is None else days)):
+        params = {'q': query, 'hl': 'en-US', 'gl': 'US', 'ceid': 'US:en'}
+        try:
+            response = Session.get(search_url, params=params)
+            response.raise_for_status()
+        except Exception as e:
+            if page == 0:
+                raise  # nothing found yet, so the search failed rather than ran out
+            # usually google throttling the date pages, stop paging and keep what the earlier pages found
+            print(f"'{keyword}': search stopped at '{query}': {e}")
+            return
+        for headline, link in Parser.news_cards(response.text):
+            if link.startswith('./'):
+                link = 'https://news.google.com' + link[1:]
+            yield {
+                'headline': headline,
+                'link': link
+            }
+
+def iter_search(keyword, source=None, days=None):
+    # html search pages and/or the rss feeds (google news plus any publisher feeds), minus anything already seen
+    source = source or Config.search_source
+    streams = []
+    if source in ('rss', 'both'):
+        streams.append(Feeds.iter_gnews_rss(keyword))
+        streams.append(Feeds.iter_publisher_feeds(keyword))
+    if source in ('html', 'both'):
+        streams.append(iter_gnews(keyword, days))
+    if not streams:
+        raise ValueError(f"unknown search source {source}")
+
+    seen = set()
+    error = None
+    for stream in streams:
+        try:
+            for article in stream:
+                # rss and html links differ but share the google article id
+                key = Resolver.article_id(article['link']) or article['link']
+                if key in seen or article['headline'].lower() in seen:
+                    continue
+                seen.update((key, article['headline'].lower()))
+                yield article
+        except Exception as e:
+            # one source failing still leaves the others, it only counts as a failed search if nothing was found
+            print(f"'{keyword}': a search source failed, carrying on with the rest: {e}")
+            error = error or e
+    if error is not None and not seen:
+        raise error
+
+def scan_gnews(keyword, limit=None, source=None):
+    limit = Config.search_limit if limit is None else limit  # 20 by default for the sake of me free api limit
+    return list(itertools.islice(Deadline.iterate(iter_search(keyword, source)), limit))
+
+def cache_key(*parts):
+    return hashlib.sha256(json.dumps(parts).encode('utf-8')).hexdigest()
 
 def filter(google_results, keyword):
-    genai.configure(api_key=get_api_key())
-    model = genai.GenerativeModel("models/gemini-2.5-flash-lite-preview-06-17")
-    headlines = [i['headline'] for i in google_results]
+    headlines = list(dict.fromkeys(i['headline'] for i in google_results))
+    set_key = cache_key(Config.gemini_model, filter_prompt_version, keyword, sorted(headlines))
+    cached = filter_cache.get(set_key)
+    if cached is not None:
+        unrelated = set(json.loads(cached))
+    else:
+        # reuse verdicts from earlier runs and only ask about headlines we havent seen
+        verdicts = {}
+        for headline in headlines:
+            verdict = filter_cache.get(cache_key(Config.gemini_model, filter_prompt_version, keyword, headline))
+            if verdict is not None:
+                verdicts[headline] = verdict == 'unrelated'
+        new_headlines = [headline for headline in headlines if headline not in verdicts]
+        removals = set()  # stays empty when every headline already had a verdict
+        if new_headlines:
+            # obvious ones are settled locally, gemini only gets the unsure ones
+            related, dropped, unsure = Prefilter.split(headlines, keyword)
+            local = {headline: False for headline in related} | {headline: True for headline in dropped}
+            asking = [headline for headline in new_headlines if headline not in local]
+            removals = ask_in_time(asking, keyword)
+            print(f"prefilter settled {len(new_headlines) - len(asking)} of {len(new_headlines)} headlines locally")
+            for headline in new_headlines:
+                if headline in local:
+                    verdicts[headline] = local[headline]
+                    continue
+                if removals is None:
+                    verdicts[headline] = False  # out of time, keep it and dont remember a verdict that was never made
+                    continue
+                verdicts[headline] = headline in removals
+                filter_cache.put(cache_key(Config.gemini_model, filter_prompt_version, keyword, headline), 'unrelated' if verdicts[headline] else 'related')
+        unrelated = {headline for headline, is_unrelated in verdicts.items() if is_unrelated}
+        if removals is not None:
+            filter_cache.put(set_key, json.dumps(sorted(unrelated)))
+    return [article for article in google_results if article['headline'] not in unrelated]
+
+def ask_in_time(headlines, keyword):
+    # None when the filter budget ran out before gemini answered
+    if not headlines:
+        return set()
+    try:
+        if not Deadline.expired():
+            return ask_unrelated(headlines, keyword)
+    except Exception as e:
+        if not Deadline.expired():
+            raise
+    print(f"'{keyword}': filter budget ran out, keeping {len(headlines)} unchecked headlines")
+    return None
+
+def ask_unrelated(headlines, keyword):
+    model = Models.get()
+    numbered = "\n".join(f"{i}: {headline}" for i, headline in enumerate(headlines))
 
     prompt = (
-        f"Given the following list of news headlines, return only those that are clearly not related to the keyword '{keyword}'. It is completely fine and likely that there are none. You may also compare the headlines to each other to determine if they are related.\n"
-        "Return the result as only the headlines in a separated list, exactly as how it was before. Just the unrelated headlines. If there are none just return nothing\n\n"
+        f"Given the following numbered list of news headlines, return only those that are clearly not related to the keyword '{keyword}'. It is completely fine and likely that there are none. You may also compare the headlines to each other to determine if they are related.\n"
+        "Return the result as a JSON list of the numbers of just the unrelated headlines. If there are none return an empty list\n\n"
         "Here is the list:\n"
-        f"{headlines}"
+        f"{numbered}"
     )
 
-    response = model.generate_content(prompt)
-    for removal in response.text.splitlines():
-        if removal:
-            google_results = [article for article in google_results if article['headline'] != removal]
-    return google_results
+    response = model.generate_content(prompt, generation_config=genai.GenerationConfig(response_mime_type="application/json", response_schema=list[int]), request_options=Deadline.request_options())
+    Prompt.record(response)
+    return {headlines[i] for i in parse_unrelated(response.text, headlines)}
 
-def manage_thread(article):
-    time.sleep(0.5) 
-    content = get_content(article['link'])
-    return {'headline': article['headline'], 'link': article['link'], 'content': content}
+def parse_unrelated(text, headlines):
+    # returns the set of indices gemini marked as unrelated
+    try:
+        indices = json.loads(text)
+        if isinstance(indices, list) and all(isinstance(i, int) and not isinstance(i, bool) for i in indices):
+            return {i for i in indices if 0 <= i < len(headlines)}
+    except ValueError:
+        pass
+    # not the json we asked for, fall back to matching lines against the headlines like before
+    positions = {headline: i for i, headline in enumerate(headlines)}
+    found = set()
+    for line in text.splitlines():
+        line = line.strip()
+        if line in positions:
+            found.add(positions[line])
+        elif ':' in line and line.split(':', 1)[1].strip() in positions:
+            found.add(positions[line.split(':', 1)[1].strip()])
+    return found
 
-def run_thread(filtered_results):
-    threads = min(10, len(filtered_results))
-    print(f"using {threads} threads")
-    with ThreadPoolExecutor(max_workers=threads) as runner:
-        articles_w_content = list(runner.map(manage_thread, filtered_results))
-    return articles_w_content
+async def download(client, url, limiter):
+    # io stage: returns (cached content, None, None) or (None, response, html bytes) and never parses
+    entry = content_cache.lookup(url)
+    if entry and entry['fresh']:
+        return entry['value'], None, None
+    target = entry['key'] if entry else url
+    try:
+        return await Retry.call_async(target, lambda: download_once(client, target, entry, limiter))
+    except Exception as e:
+        return "", None, None
 
-def get_content(url):
+async def download_once(client, target, entry, limiter):
+    await RateLimiter.wait_async(target)
+    slot = await limiter.acquire(target)
+    outcome = 'error'
     try:
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        for script in soup(["script", "style"]):
-            script.decompose()
-        
-        content = ""
+        async with client.stream('GET', target, headers=content_cache.validators(entry)) as response:
+            if response.status_code == 304:
+                outcome = 'ok'
+                content_cache.revalidate(entry['key'])
+                return entry['value'], None, None
+            if response.status_code in (429, 503):
+                outcome = 'overload'
+            response.raise_for_status()
+            watcher = page_watcher(response)
+            html = bytearray()
+            async for chunk in response.aiter_bytes():
+                html += chunk
+                if len(html) >= Config.max_page_bytes or (watcher and watcher.feed_bytes(chunk)):
+                    break
+            outcome = 'ok'
+    except httpx.TimeoutException as e:
+        outcome = 'overload'
+        raise
+    finally:
+        limiter.release(slot, outcome)
+    return None, response, html
 
-        article_selectors = ['article', '.article-content', '.post-content', '.entry-content', '.content', '[role="main"]', 'main','.story-body', '.article-body']
-        
-        for selector in article_selectors:
-            article_element = soup.select_one(selector)
-            if article_element:
-                content = article_element.get_text(strip=True)
-                break
-        
-        if not content:
-            paragraphs = soup.find_all('p')
-            content = ' '.join([p.get_text(strip=True) for p in paragraphs])
-        
-        content = re.sub(r'\s+', ' ', content)
-        content = content.strip()
-        
-        if len(content) > 5000:
-            content = content[:5000] + "..."
-            
+def parse_executor(workers):
+    # parsing is cpu bound so it goes to other processes, unless this python has no gil
+    if hasattr(sys, '_is_gil_enabled') and not sys._is_gil_enabled():
+        return ThreadPoolExecutor(max_workers=workers)
+    return ProcessPoolExecutor(max_workers=workers)
+
+def page_watcher(response):
+    # leaving the stream early closes the connection, so the rest of the page is never downloaded
+    if Config.stream_pages:
+        return Parser.StreamWatcher(response.encoding or 'utf-8')
+    return None
+
+def decode_page(response, html):
+    return bytes(html).decode(response.encoding or 'utf-8', errors='replace')
+
+def store_content(url, response, content):
+    if content:
+        content_cache.put(str(response.url), content, response.headers.get('ETag'), response.headers.get('Last-Modified'), url=url)
+
+async def fetch_all(filtered_results, concurrency=None, parse_workers=None, client=None, pool=None):
+    # client and pool can be passed in to keep them warm between calls, otherwise they live for this call only
+    # without a fixed concurrency the shared adaptive limiter decides how many downloads run at once
+    parse_workers = min(parse_workers or Config.parse_workers, max(len(filtered_results), 1))
+    if client is None:
+        async with Session.async_client() as client:
+            return await fetch_all(filtered_results, concurrency, parse_workers, client, pool)
+    if pool is None:
+        with parse_executor(parse_workers) as pool:
+            return await fetch_all(filtered_results, concurrency, parse_workers, client, pool)
+
+    limiter = fetch_limiter if concurrency is None else Concurrency.AdaptiveLimiter(concurrency, concurrency, concurrency)
+    queue = asyncio.Queue(maxsize=Config.parse_queue_depth)  # downloads wait here when parsing falls behind
+    contents = [""] * len(filtered_results)
+    loop = asyncio.get_running_loop()
+    backend = Parser.pick()
+
+    async def fetcher(i, url):
+        cached, response, html = await download(client, url, limiter)
+        if response is None:
+            contents[i] = cached
+        else:
+            await queue.put((i, url, response, decode_page(response, html)))
+
+    async def parser(pool):
+        while (item := await queue.get()) is not None:
+            i, url, response, html = item
+            try:
+                contents[i] = await loop.run_in_executor(pool, Parser.article_text, html, backend)
+            except Exception as e:
+                continue
+            store_content(url, response, contents[i])
+
+    parsers = [asyncio.create_task(parser(pool)) for _ in range(parse_workers)]
+    # fetches still going when the budget runs out are dropped, pages already downloaded still get parsed
+    await Deadline.gather(fetcher(i, article['link']) for i, article in enumerate(filtered_results))
+    for _ in parsers:
+        await queue.put(None)
+    await asyncio.gather(*parsers)
+    return [{'headline': article['headline'], 'link': article['link'], 'content': content} for article, content in zip(filtered_results, contents)]
+
+def run_async(filtered_results, concurrency=None, parse_workers=None):
+    parse_workers = parse_workers or Config.parse_workers
+    print(f"using {concurrency or f'adaptive ({fetch_limiter.stats()})'} concurrent fetches and {parse_workers} parse workers")
+    return asyncio.run(fetch_all(filtered_results, concurrency, parse_workers))
+
+def get_content(url):
+    entry = content_cache.lookup(url)
+    if entry and entry['fresh']:
+        return entry['value']
+    target = entry['key'] if entry else url
+
+    def attempt():
+        with Session.stream(target, headers=content_cache.validators(entry)) as response:
+            if response.status_code == 304:
+                content_cache.revalidate(entry['key'])
+                return entry['value'], None, None
+            response.raise_for_status()
+            watcher = page_watcher(response)
+            html = bytearray()
+            for chunk in response.iter_bytes():
+                html += chunk
+                if len(html) >= Config.max_page_bytes or (watcher and watcher.feed_bytes(chunk)):
+                    break
+        return None, response, html
+
+    try:
+        cached, response, html = Retry.call(target, attempt)
+        if response is None:
+            return cached
+        content = Parser.article_text(decode_page(response, html))
+        store_content(url, response, content)
         return content
-        
     except Exception as e:
         return ""
 
+def drop_duplicates(articles_w_content, keyword):
+    kept, dropped = Dedup.dedupe(articles_w_content)
+    if dropped:
+        print(f"'{keyword}': dropped {dropped} near duplicate articles")
+    return kept
+
+def summary_key(articles_w_content, keyword):
+    pairs = [(article['link'], article['content']) for article in articles_w_content]
+    return cache_key(Config.gemini_model, summary_prompt_version, keyword, pairs)
+
 def summarize(articles_w_content, keyword):
-    genai.configure(api_key=get_api_key())
-    model = genai.GenerativeModel("models/gemini-2.5-flash-lite-preview-06-17")
-    
-    text = ""
-    for i, article in enumerate(articles_w_content, 1):
-        text += f"\n\n Article {i}: {article['headline']} \n"
-        text += f"Source: {article['link']}\n"
-        text += f"Content: {article['content']}\n"
+    # returns (summary, cache_hit), raises if gemini fails so an error never gets saved as a summary
+    key = summary_key(articles_w_content, keyword)
+    cached = summary_cache.get(key)
+    if cached is not None:
+        return cached, True
+
+    model = Models.get()
+    prompt = summary_prompt(articles_w_content, keyword)
     
-    prompt = f"""
-    Please analyze and summarize the following {len(articles_w_content)} news articles related to "{keyword}".
+    response = model.generate_content(prompt, request_options=Deadline.request_options())
+    Prompt.record(response)
+    summary_cache.put(key, response.text)
+    return response.text, False
+
+def summarize_stream(articles_w_content, keyword):
+    # same as summarize but yields the text as gemini writes it, raises if it fails part way
+    key = summary_key(articles_w_content, keyword)
+    cached = summary_cache.get(key)
+    if cached is not None:
+        yield cached_note
+        yield cached
+        return
+
+    model = Models.get()
+    prompt = summary_prompt(articles_w_content, keyword)
+    response = model.generate_content(prompt, stream=True, request_options=Deadline.request_options())
+    parts = []
+    for chunk in response:
+        parts.append(chunk.text)
+        yield chunk.text
+    Prompt.record(response)
+    summary_cache.put(key, ''.join(parts))
+
+def summary_prompt(articles_w_content, keyword):
+    if use_map_reduce(articles_w_content):
+        # map: every article gets boiled down on its own, reduce: the report is written from those
+        articles_w_content = map_summaries(articles_w_content)
+
+    budget = Config.prompt_token_budget - Prompt.estimate_tokens(summary_template.format(count=len(articles_w_content), keyword=keyword, text=''))
+    text, packed = Prompt.pack(articles_w_content, budget)
+    print(f"'{keyword}': prompt ~{packed['tokens']} tokens for {packed['articles']} articles ({packed['trimmed']} trimmed, {packed['dropped']} dropped to fit)")
+    return summary_template.format(count=packed['articles'], keyword=keyword, text=text)
+
+summary_template = """
+    Please analyze and summarize the following {count} news articles related to "{keyword}".
     
     Create a comprehensive summary that includes:
     1. A brief overview of the main themes and trends
@@ -125,19 +388,86 @@ def summarize(articles_w_content, keyword):
     Here are the articles:
     {text}
     """
-    
+
+def use_map_reduce(articles_w_content):
+    if Config.summarize_mode == 'auto':
+        return len(articles_w_content) > Config.map_reduce_threshold
+    return Config.summarize_mode == 'mapreduce'
+
+def map_summaries(articles_w_content):
+    # returns the articles with content swapped for a short summary of it
+    # summaries are cached by content so an article only ever gets summarized once, whatever topic it's in
+    keys = [cache_key(Config.gemini_model, map_prompt_version, article['content']) for article in articles_w_content]
+    summaries = [map_cache.get(key) for key in keys]
+    missing = [i for i, summary in enumerate(summaries) if summary is None and articles_w_content[i]['content']]
+    batches = [missing[i:i + Config.map_batch_size] for i in range(0, len(missing), Config.map_batch_size)]
+    print(f"map step: {len(articles_w_content) - len(missing)} cached, {len(missing)} to summarize in {len(batches)} batches")
+
+    with ThreadPoolExecutor(max_workers=max(1, min(Config.map_concurrency, len(batches)))) as runner:
+        results = runner.map(lambda batch: summarize_batch([articles_w_content[i] for i in batch]), batches)
+        for batch, result in zip(batches, results):
+            for i, summary in zip(batch, result):
+                summaries[i] = summary
+                if summary is not None:
+                    map_cache.put(keys[i], summary)
+
+    return [
+        {**article, 'content': summary if summary is not None else Prompt.trim(article['content'], Config.min_article_tokens)}
+        for article, summary in zip(articles_w_content, summaries)
+    ]
+
+def summarize_batch(articles):
+    # one summary per article in the same order, None for all of them if gemini doesnt play along
+    model = Models.get()
+    text = ''.join(Prompt.article_block(i, article, article['content']) for i, article in enumerate(articles, 1))
+    prompt = (
+        f"Summarize each of the following {len(articles)} news articles in 3 to 5 sentences, keeping the key facts, names and numbers.\n"
+        "Return a JSON list with exactly one summary string per article, in the same order as the articles.\n\n"
+        f"{text}"
+    )
     try:
-        response = model.generate_content(prompt)
-        return response.text
+        # the map step only gets half of what's left, the final summary needs the rest
+        response = model.generate_content(prompt, generation_config=genai.GenerationConfig(response_mime_type="application/json", response_schema=list[str]), request_options=Deadline.request_options(0.5))
+        Prompt.record(response)
+        result = json.loads(response.text)
     except Exception as e:
-        return f"{str(e)}"
+        return [None] * len(articles)
+    if not isinstance(result, list) or len(result) != len(articles):
+        return [None] * len(articles)
+    return [summary if isinstance(summary, str) and summary else None for summary in result]
 
-def to_file(summary, keyword):
+cached_note = "(cached summary, articles unchanged since last run)\n"
+
+umask = os.umask(0)  # only readable by swapping it, so once at import before any threads
+os.umask(umask)
+
+@contextmanager
+def atomic_open(filename):
+    # writes go to a temp file next to the real one and only replace it once everything is written
+    folder = os.path.dirname(os.path.abspath(filename))
+    fd, temp = tempfile.mkstemp(dir=folder, prefix='.' + os.path.basename(filename), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            yield f
+        # mkstemp makes it 0600, give it the mode a plain open() would have
+        try:
+            mode = os.stat(filename).st_mode & 0o777
+        except FileNotFoundError:
+            mode = 0o666 & ~umask
+        os.chmod(temp, mode)
+        os.replace(temp, filename)
+    except BaseException:
+        os.remove(temp)
+        raise
+
+def to_file(summary, keyword, cache_hit=False):
     filename = f"news_summary_{keyword}.txt"
     
     try:
-        with open(filename, 'w', encoding='utf-8') as f:
+        with atomic_open(filename) as f:
             f.write(f"NEWS SUMMARY FOR '{keyword.upper()}'\n")
+            if cache_hit:
+                f.write(cached_note)
             f.write(summary)
         
         print(f"saved to {filename}")
@@ -146,25 +476,156 @@ def to_file(summary, keyword):
         print(f"error {str(e)}")
         return None
 
-if __name__ == "__main__":
-    start=time.time()
+def stream_to_file(articles_w_content, keyword):
+    # prints the summary and writes it out as it arrives, the file only shows up once it's complete
+    filename = f"news_summary_{keyword}.txt"
+
     try:
-        keyword = input("??: ")
+        with atomic_open(filename) as f:
+            f.write(f"NEWS SUMMARY FOR '{keyword.upper()}'\n")
+            for chunk in summarize_stream(articles_w_content, keyword):
+                f.write(chunk)
+                f.flush()
+                print(chunk, end='', flush=True)
         
-        print(f"searching for '{keyword}' on gnews")
-        google_results = scan_gnews(keyword)
-        print(f"before {len(google_results)}")
-        print("filtering articles")
+        print(f"\nsaved to {filename}")
+        return filename
+    except Exception as e:
+        print(f"\nerror {str(e)}")
+        return None
+
+def search_topic(keyword):
+    # None when the search failed, so the topic gets skipped instead of summarized with nothing in it
+    try:
+        return scan_gnews(keyword)
+    except Exception as e:
+        print(f"error with '{keyword}': {e}")
+        return None
+
+def filter_topic(google_results, keyword):
+    if google_results is None:
+        return None
+    try:
         filtered_results = filter(google_results, keyword)
-        print(f"after {len(filtered_results)} ")
+    except Exception as e:
+        # better a few unrelated articles than none at all
+        print(f"error filtering '{keyword}', keeping all {len(google_results)} articles: {e}")
+        return google_results
+    print(f"'{keyword}': before {len(google_results)} after {len(filtered_results)}")
+    return filtered_results
 
-        print("fetching contents with threading")
-        articles_w_content = run_thread(filtered_results)
-        
-        print("creating summary")
-        summary = summarize(articles_w_content, keyword)
-        to_file(summary, keyword)
+async def fetch_topics(topics, known=None, client=None, pool=None):
+    # topics is a list of filtered article lists, returns the same lists with content filled in
+    # links are resolved and fetched once no matter how many topics share them
+    # known maps publisher url -> content for articles fetched earlier, new ones get added to it
+    # topics that failed earlier are None and stay None
+    known = {} if known is None else known
+    unique = {}
+    for filtered_results in topics:
+        for article in filtered_results or []:
+            unique.setdefault(article['link'], article)
+    print(f"resolving {len(unique)} unique google news links")
+    resolved = dict(zip(unique, (article['link'] for article in await Resolver.resolve_all(list(unique.values()), client=client))))
+
+    to_fetch = list({resolved[link]: {**article, 'link': resolved[link]} for link, article in unique.items() if resolved[link] not in known}.values())
+    print(f"fetching {len(to_fetch)} new articles")
+    if to_fetch:
+        for article in await fetch_all(to_fetch, client=client, pool=pool):
+            if article['content']:  # empty ones failed or were cut off by the fetch budget, they get another go next time
+                known[article['link']] = article['content']
+
+    return [
+        None if filtered_results is None else
+        [{'headline': article['headline'], 'link': resolved[article['link']], 'content': known.get(resolved[article['link']], "")} for article in filtered_results]
+        for filtered_results in topics
+    ]
+
+def batch(keywords):
+    # every topic is searched and filtered on its own but each article is only fetched once
+    with ThreadPoolExecutor(max_workers=min(Config.batch_workers, len(keywords))) as runner:
+        print(f"searching and filtering {len(keywords)} topics")
+        with Deadline.stage('search'):
+            found = list(runner.map(search_topic, keywords))
+        with Deadline.stage('filter'):
+            topics = list(runner.map(filter_topic, found, keywords))
+        with Deadline.stage('fetch'):
+            per_topic = asyncio.run(fetch_topics(topics))
+        per_topic = [None if articles_w_content is None else drop_duplicates(articles_w_content, keyword) for articles_w_content, keyword in zip(per_topic, keywords)]
+        print("creating summaries")
+        with Deadline.stage('summarize'):
+            summaries = list(runner.map(summarize_topic, per_topic, keywords))
+    for keyword, (summary, cache_hit) in zip(keywords, summaries):
+        if summary is not None:
+            to_file(summary, keyword, cache_hit)
+
+def summarize_topic(articles_w_content, keyword):
+    # (None, False) when it failed, one topic failing shouldnt lose the others
+    if articles_w_content is None:
+        return None, False  # its search already failed and said so
+    try:
+        return summarize(articles_w_content, keyword)
+    except Exception as e:
+        print(f"error summarizing '{keyword}': {e}")
+        return None, False
+
+def read_keywords(path):
+    with open(path, encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip() and not line.startswith('#')]
+
+if __name__ == "__main__":
+    start=time.time()
+    Deadline.start()
+    try:
+        args = argparse.ArgumentParser(description="search google news and summarize each topic")
+        args.add_argument('keywords', nargs='*', help="topics to run, asks for one if none are given")
+        args.add_argument('-f', '--file', help="file with one topic per line")
+        args.add_argument('--feed', action='append', default=[], help="publisher rss/atom feed to search too with the rss source, can be repeated")
+        args = args.parse_args()
+        Config.feed_urls += args.feed
+        keywords = args.keywords + (read_keywords(args.file) if args.file else [])
+        if not keywords:
+            keywords = [input("??: ")]
+        keywords = list(dict.fromkeys(keywords))
+
+        if len(keywords) > 1:
+            batch(keywords)
+        else:
+            keyword = keywords[0]
+            print(f"searching for '{keyword}' on gnews")
+            with Deadline.stage('search'):
+                google_results = scan_gnews(keyword)
+            print(f"before {len(google_results)}")
+            print("filtering articles")
+            with Deadline.stage('filter'):
+                filtered_results = filter(google_results, keyword)
+            print(f"after {len(filtered_results)} ")
+
+            with Deadline.stage('fetch'):
+                print("resolving google news links")
+                filtered_results = Resolver.resolve_links(filtered_results)
+
+                print("fetching contents with asyncio")
+                articles_w_content = run_async(filtered_results)
+            articles_w_content = drop_duplicates(articles_w_content, keyword)
+
+            print("creating summary")
+            with Deadline.stage('summarize'):
+                if Config.stream_summary:
+                    stream_to_file(articles_w_content, keyword)
+                else:
+                    summary, cache_hit = summarize_topic(articles_w_content, keyword)
+                    if summary is not None:
+                        to_file(summary, keyword, cache_hit)
     except Exception as e:
         print(f"error {e}")
 
     print(f"elapsed time: {time.time()-start:.4f} seconds")
+    print(f"deadline: {Deadline.stats()}")
+    print(f"link cache: {Resolver.link_cache.stats()}")
+    print(f"fetch concurrency: {fetch_limiter.stats()}")
+    print(f"retries: {Retry.stats()}")
+    print(f"content cache: {content_cache.stats()}")
+    print(f"filter cache: {filter_cache.stats()}")
+    print(f"summary cache: {summary_cache.stats()}")
+    print(f"token usage: {Prompt.stats()}")
+    print(f"gemini client: {Models.stats()}")
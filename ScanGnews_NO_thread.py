@@ -1,9 +1,9 @@
-import requests
 from bs4 import BeautifulSoup
 import re
 import google.generativeai as genai
 import time
 import os
+import Session
 def get_api_key():
     api_key = os.getenv('GEMINI_API_KEY')
     if not api_key:
@@ -13,7 +13,7 @@ def get_api_key():
 def scan_gnews(keyword):
     base_url = "https://news.google.com/search"
     params = {'q': keyword, 'hl': 'en-US', 'gl': 'US', 'ceid': 'US:en'}
-    response = requests.get(base_url, params=params)
+    response = Session.get(base_url, params=params)
     soup = BeautifulSoup(response.text, 'html.parser')
     articles = []
 
@@ -53,8 +53,7 @@ def filter(google_results, keyword):
     return google_results
 def get_content(url):
     try:
-        headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'}
-        response = requests.get(url, headers=headers, timeout=10)
+        response = Session.get(url, timeout=10)
         response.raise_for_status()
         
         soup = BeautifulSoup(response.text, 'html.parser')
@@ -159,7 +158,6 @@ if __name__ == "__main__":
         for i, article in enumerate(filtered_results, 1):
             content = get_content(article['link'])
             articles_with_content.append({'headline': article['headline'], 'link': article['link'], 'content': content})
-            time.sleep(.5)
         
         print("creating summary")
         summary = summarize_articles_with_gemini(articles_with_content, keyword)
@@ -0,0 +1,57 @@
+import threading
+import httpx
+import Config
+import RateLimiter
+import Retry
+
+try:
+    import h2  # httpx only speaks http/2 when this is installed
+    http2 = True
+except ImportError:
+    http2 = False
+
+_client = None
+_lock = threading.Lock()
+
+def settings():
+    return {
+        'headers': {'User-Agent': Config.user_agent},
+        'timeout': Config.timeout,
+        'follow_redirects': True,
+        'http2': http2,
+        'limits': httpx.Limits(
+            max_connections=Config.pool_max_connections,
+            max_keepalive_connections=Config.pool_keepalive_connections,
+            keepalive_expiry=Config.pool_keepalive_expiry,
+        ),
+    }
+
+def client():
+    # one pooled client for the whole process, httpx keeps a pool per host inside it
+    global _client
+    if _client is None:
+        with _lock:
+            if _client is None:
+                _client = httpx.Client(**settings())
+    return _client
+
+def async_client():
+    # async clients are tied to the event loop so each loop gets its own one
+    return httpx.AsyncClient(**settings())
+
+def get(url, **kwargs):
+    def attempt():
+        RateLimiter.wait(url)
+        return client().get(url, **kwargs)
+    return Retry.call(url, attempt)
+
+def stream(url, **kwargs):
+    RateLimiter.wait(url)
+    return client().stream('GET', url, **kwargs)
+
+def close():
+    global _client
+    with _lock:
+        if _client is not None:
+            _client.close()
+            _client = None
@@ -1,11 +1,11 @@
-from time import sleep
-import requests
 from bs4 import BeautifulSoup
+import RateLimiter
+import Session
 
 def crawler(url):
     try:
         count=0
-        response = requests.get(url, timeout=2)
+        response = Session.get(url, timeout=2)
         response.raise_for_status()         
         soup = BeautifulSoup(response.text, 'html.parser')
         soup_links = soup.find_all('a', href=True)
@@ -27,12 +27,11 @@ def visit(links):
             vis = crawler(url)
             print(f"visited #{count}: {url} | found: {vis}")            
             if count >= browse_limit: break
-    sleep(delay_amt)
     print(f"total links found: {len(links)-1}")
 
 def disallow_links(url):
     try:
-        response = requests.get(f'{url}/robots.txt', timeout=2)
+        response = Session.get(f'{url}/robots.txt', timeout=2)
         response.raise_for_status()
         for line in response.text.splitlines():
             if line.startswith('Disallow:'):
@@ -44,11 +43,10 @@ def disallow_links(url):
 links=['https://www.caltech.edu']
 disallow=[]
 browse_limit = 30
-delay_amt = .5
 
 disallow_links('https://www.caltech.edu')
 print(disallow)
 
 
-print(f"starting with browse limit: {browse_limit} and delay amount: {delay_amt} sec on {links}")
+print(f"starting with browse limit: {browse_limit} and {RateLimiter.limiter.rate} req/s per host on {links}")
 visit(links)
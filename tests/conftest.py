@@ -0,0 +1,9 @@
+import os
+import sys
+from pathlib import Path
+
+# the modules live at the top of the repo, and tests shouldnt touch the real cache
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('GNEWS_CACHE_PATH', ':memory:')
+
+fixtures = Path(__file__).resolve().parent / 'fixtures'
@@ -0,0 +1,29 @@
+import ScanGnews
+
+def articles(keyword):
+    return [{'headline': f"{keyword} news {i}", 'link': f"https://example.com/{keyword}/{i}"} for i in range(2)]
+
+def test_failed_search_is_skipped_and_failed_filter_keeps_everything(monkeypatch):
+    written = {}
+    def scan_gnews(keyword):
+        if keyword == 'broken':
+            raise RuntimeError("429 too many requests")
+        return articles(keyword)
+    def filter(google_results, keyword):
+        if keyword == 'unfiltered':
+            raise RuntimeError("gemini is down")
+        return google_results[:1]
+    async def resolve_all(unique, client=None):
+        return unique
+    async def fetch_all(to_fetch, client=None, pool=None):
+        return [{**article, 'content': f"story about {article['headline']}"} for article in to_fetch]
+    monkeypatch.setattr(ScanGnews, 'scan_gnews', scan_gnews)
+    monkeypatch.setattr(ScanGnews, 'filter', filter)
+    monkeypatch.setattr(ScanGnews.Resolver, 'resolve_all', resolve_all)
+    monkeypatch.setattr(ScanGnews, 'fetch_all', fetch_all)
+    monkeypatch.setattr(ScanGnews, 'summarize', lambda articles_w_content, keyword: (f"summary of {len(articles_w_content)} articles", False))
+    monkeypatch.setattr(ScanGnews, 'to_file', lambda summary, keyword, cache_hit=False: written.update({keyword: summary}))
+
+    ScanGnews.batch(['good', 'broken', 'unfiltered'])
+
+    assert written == {'good': "summary of 1 articles", 'unfiltered': "summary of 2 articles"}
@@ -0,0 +1,24 @@
+import Cache
+
+def sizes(cache):
+    return sum(cache.db.execute(f"SELECT COALESCE(SUM(size), 0) FROM {table}").fetchone()[0] for table in cache.tables())
+
+def test_size_cap_covers_every_table_in_the_file(tmp_path):
+    path = str(tmp_path / 'cache.sqlite3')
+    pages = Cache.Cache('content', path=path, max_bytes=1000)
+    summaries = Cache.Cache('summary', path=path, max_bytes=1000)
+    for i in range(10):
+        pages.put(f"page{i}", 'x' * 100)
+        summaries.put(f"summary{i}", 'y' * 100)
+    assert sizes(pages) <= 1000
+    assert summaries.get('summary9') == 'y' * 100
+    assert pages.get('page0') is None  # least recently used went first, whichever table it was in
+
+def test_evicted_entries_take_their_aliases_with_them(tmp_path):
+    cache = Cache.Cache('content', path=str(tmp_path / 'cache.sqlite3'), max_bytes=250)
+    for i in range(5):
+        cache.put(f"https://publisher/{i}", 'x' * 100, url=f"https://news.google.com/{i}")
+    aliases = {row[0] for row in cache.db.execute("SELECT key FROM content_alias")}
+    kept = {row[0] for row in cache.db.execute("SELECT key FROM content")}
+    assert aliases == kept
+    assert cache.get('https://news.google.com/4') == 'x' * 100
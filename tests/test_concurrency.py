@@ -0,0 +1,36 @@
+import asyncio
+import Concurrency
+
+def test_dead_host_cant_take_every_slot_or_shrink_other_hosts():
+    async def run():
+        limiter = Concurrency.AdaptiveLimiter(initial=4, minimum=1, maximum=8, latency_target=3)
+        dead = [asyncio.create_task(limiter.acquire(f"http://dead.example/{i}")) for i in range(8)]
+        await asyncio.sleep(0)
+        held = [task.result() for task in dead if task.done()]
+        assert len(held) == 4  # the rest wait on the dead host's own window
+
+        healthy = await asyncio.wait_for(asyncio.gather(*(limiter.acquire(f"http://ok.example/{i}") for i in range(4))), 1)
+        for slot in held:
+            limiter.release(slot, 'overload')
+        for slot in healthy:
+            limiter.release(slot, 'ok')
+        assert limiter.window("http://dead.example/").limit == 2
+        assert limiter.window("http://ok.example/").limit > 4
+        for task in dead:
+            task.cancel()
+        await asyncio.gather(*dead, return_exceptions=True)
+    asyncio.run(run())
+
+def test_maximum_caps_all_hosts_together():
+    async def run():
+        limiter = Concurrency.AdaptiveLimiter(initial=4, minimum=1, maximum=6, latency_target=3)
+        tasks = [asyncio.create_task(limiter.acquire(f"http://host{i % 3}.example/{i}")) for i in range(12)]
+        await asyncio.sleep(0)
+        assert sum(task.done() for task in tasks) == 6
+        limiter.release(next(task.result() for task in tasks if task.done()), 'error')
+        await asyncio.sleep(0)
+        assert sum(task.done() for task in tasks) == 7
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    asyncio.run(run())
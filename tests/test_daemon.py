@@ -0,0 +1,50 @@
+import asyncio
+import Daemon
+import ScanGnews
+
+articles = [{'headline': f"Headline {i}", 'link': f"https://example.com/{i}", 'content': f"story {i}"} for i in range(3)]
+
+def stub_pipeline(monkeypatch, summarize):
+    written = []
+    monkeypatch.setattr(ScanGnews, 'search_topic', lambda keyword: articles)
+    monkeypatch.setattr(ScanGnews, 'filter_topic', lambda results, keyword: results)
+    async def fetch_topics(topics, known, client, pool):
+        return topics
+    monkeypatch.setattr(ScanGnews, 'fetch_topics', fetch_topics)
+    monkeypatch.setattr(ScanGnews, 'summarize', summarize)
+    monkeypatch.setattr(ScanGnews, 'to_file', lambda summary, keyword, cache_hit=False: written.append(summary))
+    return written
+
+def test_failed_summary_is_not_saved_and_retried_next_poll(monkeypatch):
+    calls = []
+    def summarize(articles_w_content, keyword):
+        calls.append(keyword)
+        if len(calls) == 1:
+            raise RuntimeError("429 resource exhausted")
+        return "the summary", False
+    written = stub_pipeline(monkeypatch, summarize)
+    topic = Daemon.Topic('space', 60)
+
+    asyncio.run(Daemon.poll([topic], {}, None, None))
+    assert written == []
+    assert topic.summarized is None
+
+    asyncio.run(Daemon.poll([topic], {}, None, None))
+    assert written == ["the summary"]
+    assert topic.summarized == {article['link'] for article in articles}
+
+def test_failed_search_keeps_the_last_summary(monkeypatch):
+    search_topic, filter_topic = ScanGnews.search_topic, ScanGnews.filter_topic
+    written = stub_pipeline(monkeypatch, lambda articles_w_content, keyword: (f"summary of {len(articles_w_content)} articles", False))
+    topic = Daemon.Topic('space', 60)
+    asyncio.run(Daemon.poll([topic], {}, None, None))
+    assert written == ["summary of 3 articles"]
+
+    def scan_gnews(keyword):
+        raise RuntimeError("429 too many requests")
+    monkeypatch.setattr(ScanGnews, 'scan_gnews', scan_gnews)
+    monkeypatch.setattr(ScanGnews, 'search_topic', search_topic)
+    monkeypatch.setattr(ScanGnews, 'filter_topic', filter_topic)
+    asyncio.run(Daemon.poll([topic], {}, None, None))
+    assert written == ["summary of 3 articles"]
+    assert topic.links == topic.summarized == {article['link'] for article in articles}
@@ -0,0 +1,79 @@
+import itertools
+import json
+from contextlib import contextmanager
+import httpx
+import pytest
+import Cache
+import Feeds
+import Retry
+import ScanGnews
+
+def rss(count):
+    items = ''.join(f"<item><title>Headline {i}</title><link>https://example.com/{i}</link></item>" for i in range(count))
+    return f"<?xml version='1.0'?><rss><channel>{items}</channel></rss>".encode('utf-8')
+
+def fake_stream(body, requests):
+    @contextmanager
+    def stream(url, params=None, headers=None):
+        requests.append(headers or {})
+        yield httpx.Response(200, content=body, headers={'ETag': '"v1"'}, request=httpx.Request('GET', url))
+    return stream
+
+def test_feed_is_cached_when_the_caller_stops_early(monkeypatch):
+    requests = []
+    monkeypatch.setattr(Feeds, 'feed_cache', Cache.Cache('feeds', path=':memory:'))
+    monkeypatch.setattr(Feeds.Session, 'stream', fake_stream(rss(100), requests))
+
+    first = list(itertools.islice(Feeds.iter_feed('https://example.com/rss'), 20))
+    second = list(itertools.islice(Feeds.iter_feed('https://example.com/rss'), 20))
+
+    assert first == second
+    assert len(requests) == 1
+    entry = Feeds.feed_cache.lookup('https://example.com/rss')
+    assert entry['etag'] == '"v1"'
+    assert len(json.loads(entry['value'])) == 100
+
+def test_publisher_feeds_only_pass_matching_headlines(monkeypatch):
+    body = b"<?xml version='1.0'?><rss><channel>" + b"".join(
+        f"<item><title>{title}</title><link>https://publisher.example/{i}</link></item>".encode('utf-8')
+        for i, title in enumerate(["Quantum computers get faster", "Local bakery wins award", "A new quantum sensor"])
+    ) + b"</channel></rss>"
+    monkeypatch.setattr(Feeds, 'feed_cache', Cache.Cache('feeds', path=':memory:'))
+    monkeypatch.setattr(Feeds.Session, 'stream', fake_stream(body, []))
+    found = list(Feeds.iter_publisher_feeds('quantum computing', ['https://publisher.example/feed']))
+    assert [article['headline'] for article in found] == ["Quantum computers get faster", "A new quantum sensor"]
+
+def test_feed_fetch_is_retried(monkeypatch):
+    requests = []
+    ok = fake_stream(rss(3), requests)
+    @contextmanager
+    def flaky(url, params=None, headers=None):
+        if not requests:
+            requests.append(headers or {})
+            yield httpx.Response(503, request=httpx.Request('GET', url))
+            return
+        with ok(url, params, headers) as response:
+            yield response
+    monkeypatch.setattr(Feeds, 'feed_cache', Cache.Cache('feeds', path=':memory:'))
+    monkeypatch.setattr(Feeds.Session, 'stream', flaky)
+    monkeypatch.setattr(Retry, 'policy', Retry.RetryPolicy(attempts=3, base=0))
+    monkeypatch.setattr(Retry, 'breakers', Retry.HostBreakers())
+    assert len(list(Feeds.iter_feed('https://example.com/rss'))) == 3
+    assert len(requests) == 2
+
+def test_failing_rss_source_keeps_the_html_results(monkeypatch):
+    def broken_rss(keyword):
+        raise httpx.ConnectError("connection reset")
+        yield
+    html = [{'headline': f"Headline {i}", 'link': f"https://news.google.com/read/{i}"} for i in range(3)]
+    monkeypatch.setattr(ScanGnews.Feeds, 'iter_gnews_rss', broken_rss)
+    monkeypatch.setattr(ScanGnews, 'iter_gnews', lambda keyword, days=None: iter(html))
+    assert ScanGnews.scan_gnews('space', limit=20, source='both') == html
+
+def test_search_fails_when_every_source_failed(monkeypatch):
+    def broken_rss(keyword):
+        raise httpx.ConnectError("connection reset")
+        yield
+    monkeypatch.setattr(ScanGnews.Feeds, 'iter_gnews_rss', broken_rss)
+    with pytest.raises(httpx.ConnectError):
+        ScanGnews.scan_gnews('space', limit=20, source='rss')
@@ -0,0 +1,77 @@
+import re
+import pytest
+import Cache
+import Models
+import ScanGnews
+
+headlines = ["Quantum chip breaks record", "Best banana bread recipe", "Quantum startup raises funds"]
+
+class FakeResponse:
+    usage_metadata = None
+
+    def __init__(self, text):
+        self.text = text
+
+class FakeModel:
+    # stands in for genai.GenerativeModel, marks every headline with 'recipe' in it as unrelated
+    def __init__(self, reply=None):
+        self.reply = reply
+        self.prompts = []
+
+    def generate_content(self, prompt, **kwargs):
+        self.prompts.append(prompt)
+        if self.reply is not None:
+            return FakeResponse(self.reply)
+        numbered = re.findall(r'^(\d+): (.*)$', prompt, re.M)
+        return FakeResponse(str([int(i) for i, headline in numbered if 'recipe' in headline]))
+
+@pytest.fixture
+def model(monkeypatch):
+    model = FakeModel()
+    monkeypatch.setattr(Models, 'get', lambda name=None: model)
+    monkeypatch.setattr(ScanGnews, 'filter_cache', Cache.Cache('filter', path=':memory:'))
+    return model
+
+def test_index_list():
+    assert ScanGnews.parse_unrelated('[0, 2]', headlines) == {0, 2}
+
+def test_out_of_range_indices_are_ignored():
+    assert ScanGnews.parse_unrelated('[1, 3, -1, 99]', headlines) == {1}
+
+def test_bools_are_not_indices():
+    # true == 1 in python, so a list of bools would otherwise remove headline 1
+    assert ScanGnews.parse_unrelated('[true, false]', headlines) == set()
+
+def test_json_that_isnt_a_list():
+    assert ScanGnews.parse_unrelated('{"unrelated": [1]}', headlines) == set()
+    assert ScanGnews.parse_unrelated('1', headlines) == set()
+
+def test_line_fallback_with_exact_headlines():
+    assert ScanGnews.parse_unrelated("Here you go:\nBest banana bread recipe\n", headlines) == {1}
+
+def test_line_fallback_with_numbered_headlines():
+    assert ScanGnews.parse_unrelated("1: Best banana bread recipe\n 2: Quantum startup raises funds", headlines) == {1, 2}
+
+def test_ask_unrelated_uses_the_model(model):
+    assert ScanGnews.ask_unrelated(headlines, 'quantum') == {"Best banana bread recipe"}
+
+def test_ask_unrelated_falls_back_to_lines(model):
+    model.reply = "1: Best banana bread recipe"
+    assert ScanGnews.ask_unrelated(headlines, 'quantum') == {"Best banana bread recipe"}
+
+def test_filter_removes_every_unrelated_article_in_one_pass(model):
+    results = [{'headline': headline, 'link': f"https://example.com/{i}"} for i, headline in enumerate(headlines)]
+    results.append({'headline': "Best banana bread recipe", 'link': "https://example.com/again"})
+    kept = ScanGnews.filter(results, 'quantum')
+    assert [article['headline'] for article in kept] == ["Quantum chip breaks record", "Quantum startup raises funds"]
+    assert len(model.prompts) == 1
+
+def test_filter_with_every_headline_already_judged(model, monkeypatch):
+    # a later poll with a subset of known headlines misses the set cache but hits every per-headline verdict
+    # (only gemini verdicts are cached per headline, so the prefilter is told to settle nothing)
+    monkeypatch.setattr(ScanGnews.Prefilter, 'split', lambda headlines, keyword: ([], [], list(headlines)))
+    results = [{'headline': headline, 'link': f"https://example.com/{i}"} for i, headline in enumerate(headlines)]
+    ScanGnews.filter(results, 'quantum')
+    kept = ScanGnews.filter(results[:2], 'quantum')
+    assert [article['headline'] for article in kept] == ["Quantum chip breaks record"]
+    assert len(model.prompts) == 1
@@ -0,0 +1,21 @@
+import os
+import stat
+import ScanGnews
+
+def mode(path):
+    return stat.S_IMODE(os.stat(path).st_mode)
+
+def test_new_summary_file_follows_the_umask(tmp_path):
+    path = tmp_path / 'news_summary_space.txt'
+    with ScanGnews.atomic_open(str(path)) as f:
+        f.write("summary")
+    assert mode(path) == 0o666 & ~ScanGnews.umask
+
+def test_rewritten_summary_file_keeps_its_mode(tmp_path):
+    path = tmp_path / 'news_summary_space.txt'
+    path.write_text("old")
+    os.chmod(path, 0o640)
+    with ScanGnews.atomic_open(str(path)) as f:
+        f.write("new")
+    assert path.read_text() == "new"
+    assert mode(path) == 0o640
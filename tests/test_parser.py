@@ -0,0 +1,51 @@
+import pytest
+import Parser
+from conftest import fixtures
+
+pages = sorted((fixtures / 'pages').glob('*.html'))
+backends = [backend for backend in Parser.available() if backend != 'html.parser']
+
+def read(page):
+    return page.read_text(encoding='utf-8')
+
+@pytest.mark.parametrize('backend', backends)
+@pytest.mark.parametrize('page', pages, ids=lambda page: page.stem)
+def test_article_text_matches_html_parser(page, backend):
+    html = read(page)
+    assert Parser.article_text(html, backend) == Parser.article_text(html, 'html.parser')
+
+@pytest.mark.parametrize('backend', backends)
+@pytest.mark.parametrize('page', pages, ids=lambda page: page.stem)
+def test_news_cards_match_html_parser(page, backend):
+    html = read(page)
+    assert Parser.news_cards(html, backend) == Parser.news_cards(html, 'html.parser')
+
+def test_empty_article_falls_back_to_paragraphs():
+    assert Parser.article_text(read(fixtures / 'pages' / 'empty_article.html'), 'html.parser').startswith('Lorem ipsum')
+
+def test_nested_class_takes_the_first_match():
+    # p.post-content comes before div.entry-content in the selector list, same as the old cascade
+    assert Parser.article_text(read(fixtures / 'pages' / 'nested_p_class.html'), 'html.parser') == 'teaser'
+
+def test_cards_skip_links_without_href():
+    cards = Parser.news_cards(read(fixtures / 'pages' / 'cards.html'), 'html.parser')
+    assert len(cards) == 100
+    assert cards[0] == ('Headline0', './read/0')  # text is joined with strip=True like the original scraper
+
+def streamed(html, size=256):
+    # what get_content would have downloaded before the watcher said stop
+    watcher = Parser.StreamWatcher()
+    data = html.encode('utf-8')
+    for end in range(size, len(data) + size, size):
+        if watcher.feed_bytes(data[end - size:end]):
+            return data[:end].decode('utf-8', errors='replace')
+    return html
+
+@pytest.mark.parametrize('page', pages, ids=lambda page: page.stem)
+def test_stopping_early_gives_the_same_text(page):
+    html = read(page)
+    assert Parser.article_text(streamed(html)) == Parser.article_text(html)
+
+def test_empty_article_is_downloaded_in_full():
+    html = read(fixtures / 'pages' / 'empty_article.html')
+    assert streamed(html) == html
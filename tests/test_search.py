@@ -0,0 +1,46 @@
+import httpx
+import pytest
+import Retry
+import ScanGnews
+
+def cards(start, count):
+    body = ''.join(f"<div class='m5k28'><a class='JtKRv' href='./read/{i}'>Headline {i}</a></div>" for i in range(start, start + count))
+    return f"<html><body>{body}</body></html>"
+
+def fake_get(failure):
+    # the first page works, every page after it fails the given way
+    calls = []
+    def get(url, params=None):
+        calls.append(params['q'])
+        if len(calls) > 1:
+            if isinstance(failure, Exception):
+                raise failure
+            return httpx.Response(failure, request=httpx.Request('GET', url))
+        return httpx.Response(200, text=cards(0, 5), request=httpx.Request('GET', url))
+    return get
+
+def test_paging_stops_on_an_open_circuit(monkeypatch):
+    monkeypatch.setattr(ScanGnews.Session, 'get', fake_get(Retry.CircuitOpen("too many failures from news.google.com")))
+    assert len(ScanGnews.scan_gnews('space', limit=20, source='html')) == 5
+
+def test_paging_stops_on_a_transport_error(monkeypatch):
+    monkeypatch.setattr(ScanGnews.Session, 'get', fake_get(httpx.ConnectError("connection reset")))
+    assert len(ScanGnews.scan_gnews('space', limit=20, source='html')) == 5
+
+def test_paging_stops_on_an_error_status(monkeypatch):
+    monkeypatch.setattr(ScanGnews.Session, 'get', fake_get(429))
+    assert len(ScanGnews.scan_gnews('space', limit=20, source='html')) == 5
+
+def test_failed_first_page_raises(monkeypatch):
+    def get(url, params=None):
+        raise Retry.CircuitOpen("too many failures from news.google.com")
+    monkeypatch.setattr(ScanGnews.Session, 'get', get)
+    with pytest.raises(Retry.CircuitOpen):
+        ScanGnews.scan_gnews('space', limit=20, source='html')
+
+def test_error_status_on_the_first_page_raises(monkeypatch):
+    def get(url, params=None):
+        return httpx.Response(429, request=httpx.Request('GET', url))
+    monkeypatch.setattr(ScanGnews.Session, 'get', get)
+    with pytest.raises(httpx.HTTPStatusError):
+        ScanGnews.scan_gnews('space', limit=20, source='html')